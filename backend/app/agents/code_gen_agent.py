@@ -6,11 +6,13 @@ correct, framework-compliant code using LLM with optional documentation context.
 """
 
 import logging
-from typing import Any, List, Optional
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 
 from openai import AsyncOpenAI
 import openai
 
+from app.agents.syntax_validator import SyntaxValidator
 from app.core.config import settings
 from app.services.gemini_client import GeminiClient
 from app.schemas.agent import CodeGenerationResult, DocumentationResult
@@ -18,6 +20,28 @@ from app.utils.retry import llm_api_retry
 
 logger = logging.getLogger(__name__)
 
+# The validator keeps no per-call state, so one instance serves every agent
+_syntax_validator = SyntaxValidator()
+
+
+@lru_cache(maxsize=256)
+def _validate_syntax(code: str, language: str) -> Tuple[bool, Tuple[str, ...]]:
+    """
+    Validate generated code, memoized on (code, language).
+    
+    Retries frequently get identical code back from the LLM, so repeated
+    validation of the same output is served from the cache.
+    
+    Args:
+        code: Generated code
+        language: Programming language of the code
+        
+    Returns:
+        Tuple of (valid, errors)
+    """
+    result = _syntax_validator.validate_syntax(code, language)
+    return result["valid"], tuple(result.get("errors", []))
+
 
 class CodeGenAgent:
     """
@@ -33,6 +57,29 @@ class CodeGenAgent:
         max_retries: Maximum number of syntax validation retries
     """
     
+    # Framework to language mapping
+    _FRAMEWORK_LANGUAGES = {
+        "NestJS": "TypeScript",
+        "React": "JavaScript",
+        "FastAPI": "Python",
+        "Spring Boot": "Java",
+        ".NET Core": "C#",
+        "Vue.js": "JavaScript",
+        "Angular": "TypeScript",
+        "Django": "Python",
+        "Express.js": "JavaScript"
+    }
+    
+    # Prompt keywords per language, checked in order; "javascript" must be
+    # tested before "java" because the keywords match as substrings
+    _PROMPT_LANGUAGE_KEYWORDS = (
+        ("Python", ("python", "fastapi", "django", "flask")),
+        ("TypeScript", ("typescript", "nestjs", "angular")),
+        ("JavaScript", ("javascript", "react", "vue", "express", "node")),
+        ("Java", ("java", "spring")),
+        ("C#", ("c#", "csharp", ".net", "dotnet")),
+    )
+    
     def __init__(
         self,
         client: Optional[Any] = None,
@@ -164,11 +211,9 @@ class CodeGenAgent:
                 generated_code = self._extract_code_from_markdown(generated_code)
                 
                 # Validate syntax
-                from app.agents.syntax_validator import SyntaxValidator
-                validator = SyntaxValidator()
-                validation_result = validator.validate_syntax(generated_code, language)
+                syntax_valid, syntax_errors = _validate_syntax(generated_code, language)
                 
-                if validation_result["valid"]:
+                if syntax_valid:
                     logger.info(
                         "Code generation successful",
                         extra={
@@ -196,7 +241,7 @@ class CodeGenAgent:
                     )
                 else:
                     # Syntax validation failed
-                    errors = validation_result.get("errors", [])
+                    errors = list(syntax_errors)
                     logger.warning(
                         f"Syntax validation failed on attempt {attempt + 1}",
                         extra={
@@ -457,34 +502,16 @@ Important guidelines:
         Returns:
             str: Detected language
         """
-        # Framework to language mapping
-        framework_language_map = {
-            "NestJS": "TypeScript",
-            "React": "JavaScript",
-            "FastAPI": "Python",
-            "Spring Boot": "Java",
-            ".NET Core": "C#",
-            "Vue.js": "JavaScript",
-            "Angular": "TypeScript",
-            "Django": "Python",
-            "Express.js": "JavaScript"
-        }
-        
-        if framework and framework in framework_language_map:
-            return framework_language_map[framework]
+        if framework:
+            language = self._FRAMEWORK_LANGUAGES.get(framework)
+            if language:
+                return language
         
         # Try to detect from prompt
         prompt_lower = prompt.lower()
-        if any(word in prompt_lower for word in ["python", "fastapi", "django", "flask"]):
-            return "Python"
-        elif any(word in prompt_lower for word in ["typescript", "nestjs", "angular"]):
-            return "TypeScript"
-        elif any(word in prompt_lower for word in ["javascript", "react", "vue", "express", "node"]):
-            return "JavaScript"
-        elif any(word in prompt_lower for word in ["java", "spring"]):
-            return "Java"
-        elif any(word in prompt_lower for word in ["c#", "csharp", ".net", "dotnet"]):
-            return "C#"
+        for language, keywords in self._PROMPT_LANGUAGE_KEYWORDS:
+            if any(word in prompt_lower for word in keywords):
+                return language
         
         # Default to Python
         return "Python"
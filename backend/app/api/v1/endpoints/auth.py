@@ -4,7 +4,9 @@ Authentication API endpoints.
 This module defines the authentication endpoints for user registration and login.
 """
 
-from app.core.dependencies import get_current_user, get_db
+from typing import List, Optional
+
+from app.core.dependencies import get_current_user, get_db, get_token_sink
 from app.schemas.auth import (
     ChangePasswordRequest,
     LoginRequest,
@@ -255,6 +257,7 @@ async def change_password(
 async def request_password_reset(
     request: PasswordResetRequestSchema,
     auth_service: AuthService = Depends(get_auth_service),
+    token_sink: Optional[List[str]] = Depends(get_token_sink),
 ):
     """
     Request a password reset token.
@@ -269,6 +272,7 @@ async def request_password_reset(
     Args:
         request: Password reset request with email
         auth_service: Authentication service dependency
+        token_sink: Optional list that receives the issued token
 
     Returns:
         MessageResponse: Success message
@@ -278,6 +282,8 @@ async def request_password_reset(
     """
     try:
         token = auth_service.request_password_reset(request.email)
+        if token_sink is not None:
+            token_sink.append(token)
         # In production, send token via email instead of returning it
         # For now, return it in the message for testing
         return MessageResponse(
@@ -5,7 +5,7 @@ This module provides dependency functions for database sessions and other
 shared resources used across API endpoints.
 """
 
-from typing import Generator
+from typing import Generator, List, Optional
 
 from app.core.database import SessionLocal
 from app.core.security import decode_jwt_token
@@ -35,6 +35,20 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_token_sink() -> Optional[List[str]]:
+    """
+    Dependency function that provides a sink for issued password reset tokens.
+
+    Returns None, since tokens are delivered to the user rather than collected
+    in-process. Tests override it with a list to read issued tokens directly
+    instead of parsing them out of the response message.
+
+    Returns:
+        Optional[List[str]]: List to append issued tokens to, or None
+    """
+    return None
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> int:
@@ -4,26 +4,27 @@ OpenTelemetry instrumentation configuration.
 This module sets up OpenTelemetry tracing for the AI Agent System,
 including FastAPI auto-instrumentation and custom span creation for
 agent operations.
+
+Only the lightweight OpenTelemetry API is imported at module level. The SDK
+and the FastAPI instrumentation are imported inside the functions that use
+them, after the otel_enabled check, so processes running with telemetry
+disabled (tests included) never load them.
 """
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from app.core.config import settings
 from app.core.logging_config import get_logger
 from opentelemetry import trace
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import (
-    BatchSpanProcessor,
-    ConsoleSpanExporter,
-    SpanExporter,
-)
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
 
 logger = get_logger(__name__)
 
 
-def get_span_exporter() -> Optional[SpanExporter]:
+def get_span_exporter() -> Optional["SpanExporter"]:
     """
     Get the appropriate span exporter based on configuration.
     
@@ -37,6 +38,8 @@ def get_span_exporter() -> Optional[SpanExporter]:
     if not settings.otel_enabled:
         return None
     
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    
     exporter_type = settings.otel_exporter_type.lower()
     
     if exporter_type == "console":
@@ -75,7 +78,7 @@ def get_span_exporter() -> Optional[SpanExporter]:
         return ConsoleSpanExporter()
 
 
-def configure_telemetry() -> Optional[TracerProvider]:
+def configure_telemetry() -> Optional["TracerProvider"]:
     """
     Configure OpenTelemetry tracing for the application.
     
@@ -91,6 +94,10 @@ def configure_telemetry() -> Optional[TracerProvider]:
         logger.info("telemetry_disabled", reason="otel_enabled=False")
         return None
     
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    
     try:
         # Create resource with service information
         resource = Resource.create({
@@ -146,6 +153,8 @@ def instrument_fastapi(app) -> None:
         logger.info("fastapi_instrumentation_skipped", reason="otel_enabled=False")
         return
     
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    
     try:
         FastAPIInstrumentor.instrument_app(app)
         logger.info(
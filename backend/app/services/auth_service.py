@@ -7,8 +7,11 @@ and password management.
 """
 
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from app.core.config import settings
 from app.core.security import (
@@ -24,6 +27,10 @@ from app.repositories.user_repository import UserRepository
 from jose import JWTError
 from sqlalchemy.orm import Session
 
+# Bounds for the verified-token cache in AuthService.verify_token
+TOKEN_CACHE_MAX_SIZE = 1024
+TOKEN_CACHE_TTL_SECONDS = 5.0
+
 
 class AuthService:
     """
@@ -34,6 +41,11 @@ class AuthService:
     for data access.
     """
 
+    # Payloads of recently verified tokens, keyed by the raw token string.
+    # Shared at class level because a new service is created per request.
+    _token_cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+    _token_cache_lock = threading.Lock()
+
     def __init__(self, db: Session):
         """
         Initialize the authentication service.
@@ -153,7 +165,10 @@ class AuthService:
         """
         Decode and validate a JWT token.
 
-        Verifies the token signature, expiration, and structure.
+        Verifies the token signature, expiration, and structure. Payloads
+        of valid tokens are cached for TOKEN_CACHE_TTL_SECONDS (and never
+        past the token's own expiry), so repeated verification of the same
+        token skips signature checking. Invalid tokens are never cached.
 
         Args:
             token: JWT token string
@@ -164,12 +179,33 @@ class AuthService:
         Raises:
             JWTError: If token is invalid, expired, or tampered
         """
+        now = time.time()
+
+        with self._token_cache_lock:
+            cached = self._token_cache.get(token)
+            if cached is not None:
+                payload, cached_at = cached
+                expires_at = payload.get("exp")
+                if now - cached_at < TOKEN_CACHE_TTL_SECONDS and (
+                    expires_at is None or expires_at > now
+                ):
+                    self._token_cache.move_to_end(token)
+                    return dict(payload)
+                del self._token_cache[token]
+
         try:
             payload = decode_jwt_token(token)
-            return payload
         except JWTError as e:
             raise e
 
+        with self._token_cache_lock:
+            self._token_cache[token] = (dict(payload), now)
+            self._token_cache.move_to_end(token)
+            if len(self._token_cache) > TOKEN_CACHE_MAX_SIZE:
+                self._token_cache.popitem(last=False)
+
+        return payload
+
     def change_password(
         self, user_id: int, current_password: str, new_password: str
     ) -> bool:
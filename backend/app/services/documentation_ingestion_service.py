@@ -15,7 +15,11 @@ from typing import Dict, List, Optional
 scripts_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'scripts')
 sys.path.insert(0, scripts_dir)
 
-from ingest_documentation import DocumentationIngestionPipeline
+from ingest_documentation import (
+    DocumentationIngestionPipeline,
+    find_scraped_docs,
+    list_scraped_frameworks,
+)
 
 
 class DocumentationIngestionService:
@@ -55,11 +59,11 @@ class DocumentationIngestionService:
             FileNotFoundError: If documentation file doesn't exist
             ValueError: If framework is invalid
         """
-        input_file = self.docs_dir / f"{framework}_docs.json"
+        input_file = find_scraped_docs(self.docs_dir, framework)
         
-        if not input_file.exists():
+        if input_file is None:
             raise FileNotFoundError(
-                f"Documentation file not found: {input_file}\n"
+                f"Documentation file not found: {self.docs_dir / f'{framework}_docs.ndjson'}\n"
                 f"Run scraping first: python scripts/scrape_documentation.py --framework {framework}"
             )
         
@@ -102,10 +106,9 @@ class DocumentationIngestionService:
         """
         results = {}
         
-        # If no frameworks specified, find all JSON files
+        # If no frameworks specified, find all scraped documentation files
         if frameworks is None:
-            json_files = list(self.docs_dir.glob("*_docs.json"))
-            frameworks = [f.stem.replace("_docs", "") for f in json_files]
+            frameworks = list_scraped_frameworks(self.docs_dir)
         
         if not frameworks:
             print(f"⚠ No documentation files found in {self.docs_dir}")
@@ -153,8 +156,7 @@ class DocumentationIngestionService:
         
         try:
             # Get all available frameworks from docs directory
-            json_files = list(self.docs_dir.glob("*_docs.json"))
-            frameworks = [f.stem.replace("_docs", "") for f in json_files]
+            frameworks = list_scraped_frameworks(self.docs_dir)
             
             status = {}
             for framework in frameworks:
@@ -194,7 +194,7 @@ class SemanticCache:
         Returns:
             str: Cache key (hash of prompt)
         """
-        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        prompt_hash = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
         return f"semantic_cache:{prompt_hash}"
     
     async def get(
@@ -13,6 +13,7 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+import orjson
 from app.core.config import settings
 from redis import asyncio as aioredis
 
@@ -114,11 +115,17 @@ class ToolCache:
             'tool_cache:search_framework_docs:a3f5b2c1...'
         """
         # Sort params to ensure consistent ordering
-        sorted_params = json.dumps(params, sort_keys=True)
+        sorted_params = orjson.dumps(
+            params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
         
-        # Create hash from tool name + params
-        cache_input = f"{tool_name}:{sorted_params}"
-        params_hash = hashlib.sha256(cache_input.encode()).hexdigest()[:16]
+        # Create hash from tool name + params; the key is opaque, so a fast
+        # 64-bit BLAKE2b digest is enough
+        hasher = hashlib.blake2b(digest_size=8)
+        hasher.update(tool_name.encode())
+        hasher.update(b":")
+        hasher.update(sorted_params)
+        params_hash = hasher.hexdigest()
         
         return f"tool_cache:{tool_name}:{params_hash}"
     
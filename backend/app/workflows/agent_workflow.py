@@ -7,10 +7,12 @@ state management.
 """
 
 import time
+from functools import lru_cache
 from typing import Any, Dict, List, Literal, Optional
 
 from langgraph.graph import END, StateGraph
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 
 from app.agents.code_gen_agent import CodeGenAgent, code_gen_agent
 from app.agents.documentation_search_agent import (
@@ -33,6 +35,42 @@ logger = get_logger(__name__)
 tracer = get_tracer(__name__)
 
 
+# The compiled graph is shared by every AgentWorkflow, so its nodes and routing
+# functions look up the owning workflow in the run config and delegate to it.
+def _workflow_from(config: RunnableConfig) -> "AgentWorkflow":
+    return config["configurable"]["workflow"]
+
+
+async def _supervisor_step(
+    state: WorkflowState, config: RunnableConfig
+) -> WorkflowState:
+    return await _workflow_from(config).supervisor_node(state)
+
+
+async def _search_step(state: WorkflowState, config: RunnableConfig) -> WorkflowState:
+    return await _workflow_from(config).search_node(state)
+
+
+async def _code_gen_step(state: WorkflowState, config: RunnableConfig) -> WorkflowState:
+    return await _workflow_from(config).code_gen_node(state)
+
+
+def _validate_step(state: WorkflowState, config: RunnableConfig) -> WorkflowState:
+    return _workflow_from(config).validate_node(state)
+
+
+def _route_after_supervisor(
+    state: WorkflowState, config: RunnableConfig
+) -> Literal["search", "code", "end"]:
+    return _workflow_from(config).route_after_supervisor(state)
+
+
+def _should_retry(
+    state: WorkflowState, config: RunnableConfig
+) -> Literal["retry", "done"]:
+    return _workflow_from(config).should_retry(state)
+
+
 class AgentWorkflow:
     """
     LangGraph workflow for orchestrating AI agents.
@@ -45,7 +83,7 @@ class AgentWorkflow:
         supervisor: Supervisor agent for routing decisions
         search_agent: Documentation search agent
         code_gen_agent: Code generation agent
-        graph: Compiled LangGraph workflow
+        graph: Compiled LangGraph workflow, shared by all instances
     """
     
     def __init__(
@@ -66,15 +104,19 @@ class AgentWorkflow:
         self.search_agent = search_agent_instance or documentation_search_agent
         self.code_gen_agent = code_gen_agent_instance or code_gen_agent
         
-        # Build the workflow graph
-        self.graph = self._build_graph()
+        # Reuse the compiled workflow graph
+        self.graph = self._build_compiled_graph()
     
-    def _build_graph(self) -> Any:
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _build_compiled_graph(cls) -> Any:
         """
         Build the LangGraph workflow with nodes and edges.
         
         Creates a state graph with supervisor, search, code generation,
         and validation nodes, connected with conditional edges for routing.
+        The graph only encodes structure; the agents are supplied per run via
+        the "workflow" entry of the config, so it is compiled once and cached.
         
         Returns:
             Compiled LangGraph workflow
@@ -83,10 +125,10 @@ class AgentWorkflow:
         workflow = StateGraph(WorkflowState)
         
         # Add nodes
-        workflow.add_node("supervisor", self.supervisor_node)
-        workflow.add_node("search", self.search_node)
-        workflow.add_node("code_gen", self.code_gen_node)
-        workflow.add_node("validate", self.validate_node)
+        workflow.add_node("supervisor", _supervisor_step)
+        workflow.add_node("search", _search_step)
+        workflow.add_node("code_gen", _code_gen_step)
+        workflow.add_node("validate", _validate_step)
         
         # Set entry point
         workflow.set_entry_point("supervisor")
@@ -94,7 +136,7 @@ class AgentWorkflow:
         # Add conditional edges from supervisor
         workflow.add_conditional_edges(
             "supervisor",
-            self.route_after_supervisor,
+            _route_after_supervisor,
             {
                 "search": "search",
                 "code": "code_gen",
@@ -111,7 +153,7 @@ class AgentWorkflow:
         # Add conditional edges from validation
         workflow.add_conditional_edges(
             "validate",
-            self.should_retry,
+            _should_retry,
             {
                 "retry": "search",  # Cycle back for more context
                 "done": END
@@ -548,7 +590,10 @@ class AgentWorkflow:
         
         try:
             # Execute workflow (use ainvoke for async nodes)
-            final_state = await self.graph.ainvoke(initial_state)
+            final_state = await self.graph.ainvoke(
+                initial_state,
+                config={"configurable": {"workflow": self}}
+            )
             
             # Calculate processing time
             processing_time_ms = (time.time() - start_time) * 1000
@@ -19,6 +19,7 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import orjson
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -31,6 +32,30 @@ from app.models.framework_documentation import FrameworkDocumentation
 # Use local embedding service to avoid OpenAI quota issues
 from app.services.local_embedding_service import LocalEmbeddingService as EmbeddingService
 
+# Scraper output suffixes, newest format first. Legacy pretty-printed JSON
+# files are still accepted.
+SCRAPED_DOC_SUFFIXES = (".ndjson", ".json")
+
+
+def find_scraped_docs(input_dir: Path, framework: str) -> Optional[Path]:
+    """Return the scraped documentation file for a framework, if any."""
+    for suffix in SCRAPED_DOC_SUFFIXES:
+        candidate = input_dir / f"{framework}_docs{suffix}"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def list_scraped_frameworks(input_dir: Path) -> List[str]:
+    """List frameworks that have scraped documentation in input_dir."""
+    frameworks = []
+    for suffix in SCRAPED_DOC_SUFFIXES:
+        for doc_file in sorted(input_dir.glob(f"*_docs{suffix}")):
+            framework = doc_file.stem[: -len("_docs")]
+            if framework not in frameworks:
+                frameworks.append(framework)
+    return frameworks
+
 
 class DocumentationIngestionPipeline:
     """Pipeline for ingesting documentation with embeddings."""
@@ -76,10 +101,14 @@ class DocumentationIngestionPipeline:
         )
     
     async def load_scraped_docs(self, input_file: Path) -> List[Dict]:
-        """Load scraped documentation from JSON file."""
+        """Load scraped documentation from an NDJSON or JSON file."""
         if not input_file.exists():
             raise FileNotFoundError(f"Input file not found: {input_file}")
         
+        if input_file.suffix == ".ndjson":
+            with open(input_file, 'rb') as f:
+                return [orjson.loads(line) for line in f if line.strip()]
+        
         with open(input_file, 'r', encoding='utf-8') as f:
             docs = json.load(f)
         
@@ -253,10 +282,10 @@ async def ingest_framework(
     batch_size: int = 10
 ) -> int:
     """Ingest documentation for a specific framework."""
-    input_file = input_dir / f"{framework}_docs.json"
+    input_file = find_scraped_docs(input_dir, framework)
     
-    if not input_file.exists():
-        print(f"❌ Documentation file not found: {input_file}")
+    if input_file is None:
+        print(f"❌ Documentation file not found: {input_dir / f'{framework}_docs.ndjson'}")
         print(f"   Run scraping first: python scrape_documentation.py --framework {framework}")
         return 0
     
@@ -301,20 +330,17 @@ async def ingest_all_frameworks(
     """Ingest documentation for all frameworks in the input directory."""
     results = {}
     
-    # Find all JSON files in input directory
-    json_files = list(input_dir.glob("*_docs.json"))
+    # Find all scraped documentation files in input directory
+    frameworks = list_scraped_frameworks(input_dir)
     
-    if not json_files:
+    if not frameworks:
         print(f"❌ No documentation files found in {input_dir}")
         print(f"   Run scraping first: python scrape_documentation.py --all")
         return results
     
-    print(f"\nFound {len(json_files)} framework documentation files")
+    print(f"\nFound {len(frameworks)} framework documentation files")
     
-    for json_file in json_files:
-        # Extract framework name from filename
-        framework = json_file.stem.replace("_docs", "")
-        
+    for framework in frameworks:
         try:
             count = await ingest_framework(
                 input_dir, 
@@ -339,7 +365,7 @@ def main():
         "--input",
         type=str,
         default="docs/scraped",
-        help="Input directory containing scraped documentation JSON files"
+        help="Input directory containing scraped documentation NDJSON/JSON files"
     )
     parser.add_argument(
         "--framework",
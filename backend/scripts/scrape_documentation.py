@@ -14,21 +14,53 @@ Usage:
 
 import argparse
 import asyncio
-import json
 import os
-import re
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
-from bs4 import BeautifulSoup
+import orjson
+import xxhash
+from lxml import etree
+from lxml import html as lxml_html
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedTokenizerBase
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Non-blank text nodes under a content element, evaluated entirely in lxml
+TEXT_XPATH = etree.XPath(
+    './/text()[normalize-space()][not(ancestor::script or ancestor::style)]'
+)
+DIV_BY_CLASS_XPATH = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '), $class_name)]"
+)
+
+# fetch_page retry and per-host circuit breaker settings
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+MAX_FETCH_ATTEMPTS = 4
+HOST_FAILURE_THRESHOLD = 5
+HOST_COOLDOWN_SECONDS = 60.0
+
+# Chunks are sized with the WordPiece tokenizer of all-MiniLM-L6-v2, the
+# model ingest_documentation.py embeds with. The model reads at most 256
+# word pieces including [CLS] and [SEP], so a chunk may use 256 minus the
+# special tokens and is embedded without truncation.
+EMBEDDING_TOKENIZER = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_MAX_SEQ_LENGTH = 256
+
+# Worker pool for HTML parsing and chunking, created on first use
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
 
 @dataclass
 class DocumentChunk:
@@ -41,15 +73,184 @@ class DocumentChunk:
     metadata: Optional[Dict] = None
 
 
+@lru_cache(maxsize=None)
+def get_tokenizer() -> "PreTrainedTokenizerBase":
+    """
+    Load the embedding model's tokenizer once per process.
+
+    transformers is imported here rather than at module level so importing
+    this script (e.g. for find_scraped_docs) does not load it.
+    """
+    from transformers import AutoTokenizer
+    
+    return AutoTokenizer.from_pretrained(EMBEDDING_TOKENIZER)
+
+
+def max_chunk_tokens() -> int:
+    """Word-piece budget for a chunk, excluding the model's special tokens."""
+    return EMBEDDING_MAX_SEQ_LENGTH - get_tokenizer().num_special_tokens_to_add()
+
+
+def split_long_line(
+    line: str, offsets: List[Tuple[int, int]], max_tokens: int
+) -> List[Tuple[str, int]]:
+    """
+    Split a line of more than max_tokens word pieces into shorter pieces.
+
+    Each cut is placed before the last token within the budget that starts
+    a new word, so words stay whole; only a single word longer than the
+    budget is cut between word pieces. Pieces are slices of the original
+    string at token character offsets, so no text is lost.
+
+    Returns:
+        List of (piece, token_count) tuples, counting the line's tokens
+        each piece covers
+    """
+    pieces = []
+    start = 0
+    while start < len(offsets):
+        end = min(start + max_tokens, len(offsets))
+        if end < len(offsets):
+            for cut in range(end, start, -1):
+                if line[offsets[cut][0] - 1].isspace():
+                    end = cut
+                    break
+        piece_start = offsets[start][0] if start else 0
+        piece_end = offsets[end][0] if end < len(offsets) else len(line)
+        pieces.append((line[piece_start:piece_end].rstrip(), end - start))
+        start = end
+    return pieces
+
+
+def chunk_text_by_tokens(
+    text: str, max_tokens: Optional[int] = None
+) -> List[Tuple[str, int]]:
+    """
+    Split text into chunks of at most max_tokens embedding-model word pieces.
+
+    Lines are tokenized in one batch and packed greedily, joined with
+    newlines; WordPiece splits on whitespace, so a chunk's count is the sum
+    of its lines' counts. A line longer than the budget is split on word
+    boundaries by split_long_line. max_tokens defaults to max_chunk_tokens().
+
+    Returns:
+        List of (chunk_text, token_count) tuples
+    """
+    tokenizer = get_tokenizer()
+    if max_tokens is None:
+        max_tokens = max_chunk_tokens()
+    
+    lines = [line for line in text.split('\n') if line.strip()]
+    if not lines:
+        return []
+    
+    encodings = tokenizer(lines, add_special_tokens=False, return_offsets_mapping=True)
+    chunks = []
+    buf: List[str] = []
+    buf_tokens = 0
+    
+    for line, offsets in zip(lines, encodings['offset_mapping']):
+        if len(offsets) <= max_tokens:
+            pieces = [(line, len(offsets))]
+        else:
+            pieces = split_long_line(line, offsets, max_tokens)
+        
+        for piece, piece_tokens in pieces:
+            if buf and buf_tokens + piece_tokens > max_tokens:
+                chunks.append(('\n'.join(buf), buf_tokens))
+                buf = []
+                buf_tokens = 0
+            buf.append(piece)
+            buf_tokens += piece_tokens
+    
+    if buf:
+        chunks.append(('\n'.join(buf), buf_tokens))
+    
+    return chunks
+
+
+def find_content(html: str, fallback_div_classes: tuple = ()):
+    """
+    Locate the main content element of a page.
+
+    Looks for <article>, then <main>, then a <div> with one of the
+    fallback classes. Returns None when none of them exist.
+    """
+    # lxml refuses str input that carries an XML encoding declaration
+    if html.lstrip().startswith('<?xml'):
+        html = html.encode('utf-8')
+    try:
+        root = lxml_html.document_fromstring(html)
+    except etree.ParserError:
+        return None
+    
+    for tag in ('article', 'main'):
+        content_div = root.find(f'.//{tag}')
+        if content_div is not None:
+            return content_div
+    
+    for class_name in fallback_div_classes:
+        matches = DIV_BY_CLASS_XPATH(root, class_name=f' {class_name} ')
+        if matches:
+            return matches[0]
+    return None
+
+
+def parse_and_chunk(
+    html: str, fallback_div_classes: tuple = ()
+) -> Optional[List[Tuple[str, int]]]:
+    """
+    Extract the content text of a page and split it into token chunks.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    Returns None when the page has no recognisable content element.
+    """
+    content_div = find_content(html, fallback_div_classes)
+    if content_div is None:
+        return None
+    
+    text = '\n'.join(
+        stripped for stripped in (t.strip() for t in TEXT_XPATH(content_div)) if stripped
+    )
+    return chunk_text_by_tokens(text)
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared parsing process pool, creating it on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Shut down the shared parsing process pool if it was started."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
+        _parse_pool = None
+
+
 class FrameworkScraper:
-    """Base class for framework documentation scrapers."""
+    """
+    Base class for framework documentation scrapers.
+
+    Subclasses set doc_pages and, when pages may lack an <article>/<main>
+    element, the <div> classes to fall back to in fallback_div_classes.
+    """
+    
+    fallback_div_classes: tuple = ()
     
     def __init__(self, framework: str, base_url: str, version: Optional[str] = None):
         self.framework = framework
         self.base_url = base_url
         self.version = version
         self.session: Optional[aiohttp.ClientSession] = None
-        self.visited_urls = set()
+        # 64-bit xxh3 fingerprints of fetched URLs instead of the URL strings
+        self.visited_hashes: Set[int] = set()
+        self._host_failures: Dict[str, int] = {}
+        self._host_open_until: Dict[str, float] = {}
+        self.doc_pages: List[str] = []
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -62,56 +263,132 @@ class FrameworkScraper:
             await self.session.close()
     
     async def fetch_page(self, url: str) -> Optional[str]:
-        """Fetch a single page content."""
-        if url in self.visited_urls:
+        """
+        Fetch a single page content.
+
+        Timeouts, connection errors, 429 and 5xx responses are retried with
+        jittered exponential backoff. After HOST_FAILURE_THRESHOLD consecutive
+        failed pages from one host, that host is skipped for
+        HOST_COOLDOWN_SECONDS.
+        """
+        url_hash = xxhash.xxh3_64_intdigest(url)
+        if url_hash in self.visited_hashes:
             return None
         
-        try:
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    self.visited_urls.add(url)
-                    return await response.text()
-                else:
-                    print(f"⚠ Failed to fetch {url}: Status {response.status}")
-                    return None
-        except Exception as e:
-            print(f"⚠ Error fetching {url}: {e}")
+        host = urlparse(url).netloc
+        if self._host_circuit_open(host):
+            print(f"⚠ Skipping {url}: too many failures from {host}")
             return None
+        
+        error = None
+        for attempt in range(MAX_FETCH_ATTEMPTS):
+            try:
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status == 200:
+                        self.visited_hashes.add(url_hash)
+                        self._host_failures.pop(host, None)
+                        return await response.text()
+                    if response.status not in RETRYABLE_STATUSES:
+                        print(f"⚠ Failed to fetch {url}: Status {response.status}")
+                        return None
+                    error = f"Status {response.status}"
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                error = e
+            except Exception as e:
+                print(f"⚠ Error fetching {url}: {e}")
+                return None
+            
+            if attempt < MAX_FETCH_ATTEMPTS - 1:
+                await asyncio.sleep(0.5 * 2 ** attempt + random.random())
+        
+        self._record_host_failure(host)
+        print(f"⚠ Error fetching {url} after {MAX_FETCH_ATTEMPTS} attempts: {error}")
+        return None
+    
+    def _host_circuit_open(self, host: str) -> bool:
+        """Check whether requests to host are currently being skipped."""
+        open_until = self._host_open_until.get(host)
+        if open_until is None:
+            return False
+        if time.monotonic() < open_until:
+            return True
+        # Cooldown elapsed: allow requests again with a fresh failure count
+        del self._host_open_until[host]
+        self._host_failures.pop(host, None)
+        return False
     
-    def chunk_text(self, text: str, max_chunk_size: int = 1000) -> List[str]:
+    def _record_host_failure(self, host: str) -> None:
+        """Count a failed page for host and open its circuit at the threshold."""
+        failures = self._host_failures.get(host, 0) + 1
+        self._host_failures[host] = failures
+        if failures >= HOST_FAILURE_THRESHOLD:
+            self._host_open_until[host] = time.monotonic() + HOST_COOLDOWN_SECONDS
+    
+    async def parse_page(
+        self, html: str, fallback_div_classes: tuple = ()
+    ) -> Optional[List[Tuple[str, int]]]:
         """
-        Split text into chunks of approximately max_chunk_size characters.
-        Tries to split on paragraph boundaries.
+        Parse and chunk a page in the process pool.
+
+        Keeps HTML parsing off the event loop so fetches for other
+        pages and frameworks continue while a page is being parsed.
         """
-        if len(text) <= max_chunk_size:
-            return [text]
-        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_parse_pool(), parse_and_chunk, html, fallback_div_classes
+        )
+    
+    @cached_property
+    def sections(self) -> List[str]:
+        """Section names derived from doc_pages URLs, aligned by index."""
+        return [
+            page_path.strip('/').replace('/', ' > ').title() or "Introduction"
+            for page_path in self.doc_pages
+        ]
+    
+    async def scrape(self) -> List[DocumentChunk]:
+        """Scrape every page in doc_pages into documentation chunks."""
         chunks = []
-        paragraphs = text.split('\n\n')
-        current_chunk = ""
-        
-        for para in paragraphs:
-            if len(current_chunk) + len(para) + 2 <= max_chunk_size:
-                current_chunk += para + "\n\n"
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + "\n\n"
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        for page_path, section in zip(self.doc_pages, self.sections):
+            url = urljoin(self.base_url, page_path)
+            html = await self.fetch_page(url)
+            
+            if not html:
+                continue
+            
+            # Extract and chunk main content
+            text_chunks = await self.parse_page(html, self.fallback_div_classes)
+            
+            if text_chunks is None:
+                continue
+            
+            for i, (content, token_count) in enumerate(text_chunks):
+                chunk = DocumentChunk(
+                    content=content,
+                    source=url,
+                    framework=self.framework,
+                    section=section,
+                    version=self.version,
+                    metadata={
+                        "chunk_index": i,
+                        "total_chunks": len(text_chunks),
+                        "tokens": token_count,
+                    }
+                )
+                chunks.append(chunk)
+            
+            print(f"✓ Scraped {url} ({len(text_chunks)} chunks)")
         
         return chunks
-    
-    async def scrape(self) -> List[DocumentChunk]:
-        """Scrape documentation. To be implemented by subclasses."""
-        raise NotImplementedError("Subclasses must implement scrape()")
 
 
 
 class NestJSScraper(FrameworkScraper):
     """Scraper for NestJS documentation."""
     
+    fallback_div_classes = ('content',)
+    
     def __init__(self, version: Optional[str] = None):
         super().__init__("NestJS", "https://docs.nestjs.com", version or "10.x")
         self.doc_pages = [
@@ -140,52 +417,6 @@ class NestJSScraper(FrameworkScraper):
             "/websockets/gateways",
             "/microservices/basics",
         ]
-    
-    async def scrape(self) -> List[DocumentChunk]:
-        """Scrape NestJS documentation."""
-        chunks = []
-        
-        for page_path in self.doc_pages:
-            url = urljoin(self.base_url, page_path)
-            html = await self.fetch_page(url)
-            
-            if not html:
-                continue
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extract main content
-            content_div = soup.find('article') or soup.find('main') or soup.find('div', class_='content')
-            
-            if not content_div:
-                continue
-            
-            # Extract text content
-            text = content_div.get_text(separator='\n', strip=True)
-            
-            # Clean up text
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            
-            # Extract section name from URL
-            section = page_path.strip('/').replace('/', ' > ').title() or "Introduction"
-            
-            # Chunk the text
-            text_chunks = self.chunk_text(text)
-            
-            for i, chunk_text in enumerate(text_chunks):
-                chunk = DocumentChunk(
-                    content=chunk_text,
-                    source=url,
-                    framework=self.framework,
-                    section=section,
-                    version=self.version,
-                    metadata={"chunk_index": i, "total_chunks": len(text_chunks)}
-                )
-                chunks.append(chunk)
-            
-            print(f"✓ Scraped {url} ({len(text_chunks)} chunks)")
-        
-        return chunks
 
 
 
@@ -213,54 +444,14 @@ class ReactScraper(FrameworkScraper):
             "/reference/react-dom",
             "/reference/react-dom/components",
         ]
-    
-    async def scrape(self) -> List[DocumentChunk]:
-        """Scrape React documentation."""
-        chunks = []
-        
-        for page_path in self.doc_pages:
-            url = urljoin(self.base_url, page_path)
-            html = await self.fetch_page(url)
-            
-            if not html:
-                continue
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extract main content
-            content_div = soup.find('article') or soup.find('main')
-            
-            if not content_div:
-                continue
-            
-            # Remove code blocks temporarily to extract text
-            text = content_div.get_text(separator='\n', strip=True)
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            
-            section = page_path.strip('/').replace('/', ' > ').title() or "Introduction"
-            
-            text_chunks = self.chunk_text(text)
-            
-            for i, chunk_text in enumerate(text_chunks):
-                chunk = DocumentChunk(
-                    content=chunk_text,
-                    source=url,
-                    framework=self.framework,
-                    section=section,
-                    version=self.version,
-                    metadata={"chunk_index": i, "total_chunks": len(text_chunks)}
-                )
-                chunks.append(chunk)
-            
-            print(f"✓ Scraped {url} ({len(text_chunks)} chunks)")
-        
-        return chunks
 
 
 
 class FastAPIScraper(FrameworkScraper):
     """Scraper for FastAPI documentation."""
     
+    fallback_div_classes = ('md-content',)
+    
     def __init__(self, version: Optional[str] = None):
         super().__init__("FastAPI", "https://fastapi.tiangolo.com", version or "0.100+")
         self.doc_pages = [
@@ -288,102 +479,18 @@ class FastAPIScraper(FrameworkScraper):
             "/advanced/custom-response/",
             "/advanced/websockets/",
         ]
-    
-    async def scrape(self) -> List[DocumentChunk]:
-        """Scrape FastAPI documentation."""
-        chunks = []
-        
-        for page_path in self.doc_pages:
-            url = urljoin(self.base_url, page_path)
-            html = await self.fetch_page(url)
-            
-            if not html:
-                continue
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            content_div = soup.find('article') or soup.find('main') or soup.find('div', class_='md-content')
-            
-            if not content_div:
-                continue
-            
-            text = content_div.get_text(separator='\n', strip=True)
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            
-            section = page_path.strip('/').replace('/', ' > ').title() or "Introduction"
-            
-            text_chunks = self.chunk_text(text)
-            
-            for i, chunk_text in enumerate(text_chunks):
-                chunk = DocumentChunk(
-                    content=chunk_text,
-                    source=url,
-                    framework=self.framework,
-                    section=section,
-                    version=self.version,
-                    metadata={"chunk_index": i, "total_chunks": len(text_chunks)}
-                )
-                chunks.append(chunk)
-            
-            print(f"✓ Scraped {url} ({len(text_chunks)} chunks)")
-        
-        return chunks
 
 
 
 class GenericScraper(FrameworkScraper):
     """Generic scraper for other frameworks with simple documentation structure."""
     
+    # Try multiple selectors for content
+    fallback_div_classes = ('content', 'markdown', 'documentation')
+    
     def __init__(self, framework: str, base_url: str, doc_pages: List[str], version: Optional[str] = None):
         super().__init__(framework, base_url, version)
         self.doc_pages = doc_pages
-    
-    async def scrape(self) -> List[DocumentChunk]:
-        """Scrape documentation using generic approach."""
-        chunks = []
-        
-        for page_path in self.doc_pages:
-            url = urljoin(self.base_url, page_path)
-            html = await self.fetch_page(url)
-            
-            if not html:
-                continue
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Try multiple selectors for content
-            content_div = (
-                soup.find('article') or 
-                soup.find('main') or 
-                soup.find('div', class_='content') or
-                soup.find('div', class_='markdown') or
-                soup.find('div', class_='documentation')
-            )
-            
-            if not content_div:
-                continue
-            
-            text = content_div.get_text(separator='\n', strip=True)
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            
-            section = page_path.strip('/').replace('/', ' > ').title() or "Introduction"
-            
-            text_chunks = self.chunk_text(text)
-            
-            for i, chunk_text in enumerate(text_chunks):
-                chunk = DocumentChunk(
-                    content=chunk_text,
-                    source=url,
-                    framework=self.framework,
-                    section=section,
-                    version=self.version,
-                    metadata={"chunk_index": i, "total_chunks": len(text_chunks)}
-                )
-                chunks.append(chunk)
-            
-            print(f"✓ Scraped {url} ({len(text_chunks)} chunks)")
-        
-        return chunks
 
 
 # Framework configurations
@@ -480,24 +587,22 @@ async def scrape_framework(framework: str, output_dir: Path) -> List[DocumentChu
     async with scraper:
         chunks = await scraper.scrape()
     
-    # Save chunks to JSON file
-    output_file = output_dir / f"{framework}_docs.json"
+    # Save chunks as NDJSON (one chunk per line) so the writer streams and
+    # ingest_documentation.py can parse line by line
+    output_file = output_dir / f"{framework}_docs.ndjson"
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    chunks_data = [
-        {
-            "content": chunk.content,
-            "source": chunk.source,
-            "framework": chunk.framework,
-            "section": chunk.section,
-            "version": chunk.version,
-            "metadata": chunk.metadata or {}
-        }
-        for chunk in chunks
-    ]
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(chunks_data, f, indent=2, ensure_ascii=False)
+    with open(output_file, 'wb') as f:
+        for chunk in chunks:
+            f.write(orjson.dumps({
+                "content": chunk.content,
+                "source": chunk.source,
+                "framework": chunk.framework,
+                "section": chunk.section,
+                "version": chunk.version,
+                "metadata": chunk.metadata or {}
+            }))
+            f.write(b'\n')
     
     print(f"\n✓ Saved {len(chunks)} chunks to {output_file}")
     
@@ -506,13 +611,28 @@ async def scrape_framework(framework: str, output_dir: Path) -> List[DocumentChu
 
 async def scrape_all_frameworks(output_dir: Path) -> Dict[str, List[DocumentChunk]]:
     """Scrape documentation for all supported frameworks."""
-    all_chunks = {}
-    
-    for framework in FRAMEWORK_CONFIGS.keys():
-        chunks = await scrape_framework(framework, output_dir)
-        all_chunks[framework] = chunks
+    # Each framework lives on its own host, so fetch them concurrently
+    frameworks = list(FRAMEWORK_CONFIGS.keys())
+    results = await asyncio.gather(
+        *(scrape_framework(framework, output_dir) for framework in frameworks)
+    )
     
-    return all_chunks
+    return dict(zip(frameworks, results))
+
+
+def run(coro):
+    """
+    Run a coroutine to completion on uvloop when it is available.
+
+    uvloop lowers per-task overhead for the concurrent fetches. uvloop.run
+    replaces the deprecated uvloop.install(); asyncio.run is used where
+    uvloop is not installed (e.g. Windows) or predates uvloop.run.
+    """
+    try:
+        from uvloop import run as uvloop_run
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop_run(coro)
 
 
 def main():
@@ -542,19 +662,22 @@ def main():
     
     output_dir = Path(args.output)
     
-    if args.all or args.framework == "all":
-        print("\n" + "="*60)
-        print("SCRAPING ALL FRAMEWORK DOCUMENTATION")
-        print("="*60)
-        asyncio.run(scrape_all_frameworks(output_dir))
-    elif args.framework:
-        asyncio.run(scrape_framework(args.framework, output_dir))
-    else:
-        parser.print_help()
-        print("\nExample usage:")
-        print("  python scrape_documentation.py --framework nestjs")
-        print("  python scrape_documentation.py --all")
-        return 1
+    try:
+        if args.all or args.framework == "all":
+            print("\n" + "="*60)
+            print("SCRAPING ALL FRAMEWORK DOCUMENTATION")
+            print("="*60)
+            run(scrape_all_frameworks(output_dir))
+        elif args.framework:
+            run(scrape_framework(args.framework, output_dir))
+        else:
+            parser.print_help()
+            print("\nExample usage:")
+            print("  python scrape_documentation.py --framework nestjs")
+            print("  python scrape_documentation.py --all")
+            return 1
+    finally:
+        shutdown_parse_pool()
     
     print("\n" + "="*60)
     print("SCRAPING COMPLETE")
@@ -9,197 +9,274 @@ This script checks that all required components are properly configured:
 - Python dependencies
 """
 
+import argparse
+import hashlib
+import json
+import re
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+from importlib.metadata import distributions
+from importlib.util import find_spec
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Results of checks that depend only on configuration are remembered here and
+# reused while the configuration is unchanged. Checks against live services
+# (Docker, PostgreSQL, Redis) always run.
+CACHE_FILE = Path.home() / ".cache" / "dev_doc_ai" / "verify.json"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+CACHEABLE_CHECKS = frozenset({"Environment Variables", "Python Dependencies"})
+COMPOSE_FILE = Path(__file__).parent.parent.parent / "docker-compose.yml"
+REQUIREMENTS_FILE = Path(__file__).parent.parent / "requirements.txt"
 
-def check_environment_variables():
+REQUIRED_ENV_VARS = (
+    "DATABASE_URL",
+    "REDIS_URL",
+    "OPENAI_API_KEY",
+    "JWT_SECRET_KEY",
+)
+OPTIONAL_ENV_VARS = (
+    "SEMANTIC_CACHE_THRESHOLD",
+    "TOOL_CACHE_TTL",
+    "MAX_WORKFLOW_ITERATIONS",
+    "EMBEDDING_MODEL",
+)
+
+# Variables whose values are masked when printed; the URLs carry credentials
+SENSITIVE_VARS = frozenset({
+    "OPENAI_API_KEY",
+    "JWT_SECRET_KEY",
+    "DATABASE_URL",
+    "REDIS_URL",
+})
+
+
+@cache
+def _load_env_once() -> None:
+    """Load .env into the environment the first time it is needed."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@lru_cache(maxsize=None)
+def _get_env(name: str) -> Optional[str]:
+    """
+    Read an environment variable once.
+
+    .env is loaded first so its values are included.
+    """
+    _load_env_once()
+    return os.environ.get(name)
+
+
+def _normalize_name(name: str) -> str:
+    """Normalize a package name so sentence-transformers matches sentence_transformers."""
+    return name.lower().replace("-", "_").replace(".", "_")
+
+
+@lru_cache(maxsize=None)
+def _installed_distributions() -> frozenset:
+    """Collect the normalized names of all installed distributions in one scan."""
+    return frozenset(
+        _normalize_name(dist.metadata["Name"])
+        for dist in distributions()
+        if dist.metadata["Name"]
+    )
+
+
+@lru_cache(maxsize=None)
+def has_module(name: str) -> bool:
+    """
+    Check whether a module can be imported without importing it.
+
+    Modules that are already imported are found in sys.modules, and
+    installed distributions are matched by name from a single scan of
+    sys.path. Anything else (stdlib modules, packages whose import name
+    differs from their distribution name) falls back to find_spec, which
+    only locates the module, so heavy packages such as
+    sentence_transformers are not loaded just to verify they exist.
+    """
+    if name in sys.modules:
+        return True
+    if _normalize_name(name) in _installed_distributions():
+        return True
+    return find_spec(name) is not None
+
+
+def _mask(name: str, value: str) -> str:
+    """Mask the value of a sensitive variable, keeping its last 4 characters."""
+    if name not in SENSITIVE_VARS:
+        return value
+    return "***" + value[-4:] if len(value) > 4 else "***"
+
+
+def check_environment_variables() -> Tuple[bool, str]:
     """Check that required environment variables are set."""
-    print("\n=== Checking Environment Variables ===")
-    
-    required_vars = [
-        "DATABASE_URL",
-        "REDIS_URL",
-        "OPENAI_API_KEY",
-        "JWT_SECRET_KEY",
-    ]
-    
-    optional_vars = [
-        "SEMANTIC_CACHE_THRESHOLD",
-        "TOOL_CACHE_TTL",
-        "MAX_WORKFLOW_ITERATIONS",
-        "EMBEDDING_MODEL",
-    ]
+    out = []
+    out.append("\n=== Checking Environment Variables ===")
     
     missing_required = []
     missing_optional = []
     
-    for var in required_vars:
-        value = os.getenv(var)
+    for var in REQUIRED_ENV_VARS:
+        value = _get_env(var)
         if value:
-            # Mask sensitive values
-            if "KEY" in var or "PASSWORD" in var:
-                display_value = "***" + value[-4:] if len(value) > 4 else "***"
-            else:
-                display_value = value
-            print(f"✓ {var}: {display_value}")
+            out.append(f"✓ {var}: {_mask(var, value)}")
         else:
-            print(f"✗ {var}: NOT SET")
+            out.append(f"✗ {var}: NOT SET")
             missing_required.append(var)
     
-    for var in optional_vars:
-        value = os.getenv(var)
+    for var in OPTIONAL_ENV_VARS:
+        value = _get_env(var)
         if value:
-            print(f"✓ {var}: {value}")
+            out.append(f"✓ {var}: {value}")
         else:
-            print(f"⚠ {var}: NOT SET (using default)")
+            out.append(f"⚠ {var}: NOT SET (using default)")
             missing_optional.append(var)
     
     if missing_required:
-        print(f"\n❌ Missing required variables: {', '.join(missing_required)}")
-        return False
+        out.append(f"\n❌ Missing required variables: {', '.join(missing_required)}")
+        return False, "\n".join(out)
     
     if missing_optional:
-        print(f"\n⚠️  Missing optional variables: {', '.join(missing_optional)}")
+        out.append(f"\n⚠️  Missing optional variables: {', '.join(missing_optional)}")
     
-    print("\n✅ Environment variables check passed")
-    return True
+    out.append("\n✅ Environment variables check passed")
+    return True, "\n".join(out)
 
 
-def check_postgresql():
+def check_postgresql() -> Tuple[bool, str]:
     """Check PostgreSQL connection and pgvector extension."""
-    print("\n=== Checking PostgreSQL ===")
+    out = []
+    out.append("\n=== Checking PostgreSQL ===")
     
     try:
         from sqlalchemy import create_engine, text
-        from dotenv import load_dotenv
+        from sqlalchemy.pool import NullPool
         
-        load_dotenv()
-        database_url = os.getenv("DATABASE_URL")
-        vector_database_url = os.getenv("VECTOR_DATABASE_URL")
+        database_url = _get_env("DATABASE_URL")
+        vector_database_url = _get_env("VECTOR_DATABASE_URL")
         
         if not database_url:
-            print("❌ DATABASE_URL not set")
-            return False
+            out.append("❌ DATABASE_URL not set")
+            return False, "\n".join(out)
         
-        # Check main database
-        engine = create_engine(database_url)
+        # The engines run one query each, so skip connection pooling; NullPool
+        # closes connections on release and needs no dispose()
+        engine = create_engine(database_url, poolclass=NullPool)
         
+        # connect() already fails if the server is unreachable, so the one
+        # query fetches something worth reporting instead of SELECT 1
         with engine.connect() as conn:
-            result = conn.execute(text("SELECT 1"))
-            print("✓ PostgreSQL main database connection successful")
-        
-        engine.dispose()
+            version = conn.execute(text("SHOW server_version")).scalar()
+            out.append(f"✓ PostgreSQL main database connection successful (version {version})")
         
         # Check vector database with pgvector
         if not vector_database_url:
-            print("⚠ VECTOR_DATABASE_URL not set - skipping pgvector check")
-            print("\n✅ PostgreSQL check passed (main database only)")
-            return True
+            out.append("⚠ VECTOR_DATABASE_URL not set - skipping pgvector check")
+            out.append("\n✅ PostgreSQL check passed (main database only)")
+            return True, "\n".join(out)
         
-        vector_engine = create_engine(vector_database_url)
+        # Reuse the main engine when both databases are the same
+        if vector_database_url == database_url:
+            vector_engine = engine
+        else:
+            vector_engine = create_engine(vector_database_url, poolclass=NullPool)
         
         with vector_engine.connect() as conn:
-            result = conn.execute(text("SELECT 1"))
-            print("✓ PostgreSQL vector database connection successful")
-            
-            # Check pgvector extension
-            result = conn.execute(
-                text("SELECT extname, extversion FROM pg_extension WHERE extname = 'vector'")
-            )
-            row = result.fetchone()
+            out.append("✓ PostgreSQL vector database connection successful")
             
-            if row:
-                print(f"✓ pgvector extension installed (version {row[1]})")
-            else:
-                print("✗ pgvector extension NOT installed in vector database")
-                print("  Run: CREATE EXTENSION vector; in the vector database")
-                vector_engine.dispose()
-                return False
+            # Only a missing pg_extension row means pgvector is not installed;
+            # any other error is reported as it is
+            version = conn.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+            if version is None:
+                out.append("✗ pgvector extension NOT installed in vector database")
+                out.append("  Run: CREATE EXTENSION vector; in the vector database")
+                return False, "\n".join(out)
+            out.append(f"✓ pgvector extension installed (version {version})")
             
-            # Check if we can create a vector column (test)
             try:
-                conn.execute(text("SELECT '[1,2,3]'::vector"))
-                print("✓ Vector type working correctly")
+                conn.execute(text("SELECT '[1,2,3]'::vector")).scalar()
             except Exception as e:
-                print(f"✗ Vector type test failed: {e}")
-                vector_engine.dispose()
-                return False
+                out.append(f"✗ Vector type check failed: {e}")
+                return False, "\n".join(out)
+            out.append("✓ Vector type working correctly")
         
-        vector_engine.dispose()
-        print("\n✅ PostgreSQL check passed")
-        return True
+        out.append("\n✅ PostgreSQL check passed")
+        return True, "\n".join(out)
         
     except ImportError as e:
-        print(f"❌ Missing Python package: {e}")
-        print("  Run: pip install -r requirements.txt")
-        return False
+        out.append(f"❌ Missing Python package: {e}")
+        out.append("  Run: pip install -r requirements.txt")
+        return False, "\n".join(out)
     except Exception as e:
-        print(f"❌ PostgreSQL connection failed: {e}")
-        print("  Make sure PostgreSQL is running: docker-compose up -d")
-        return False
+        out.append(f"❌ PostgreSQL connection failed: {e}")
+        out.append("  Make sure PostgreSQL is running: docker-compose up -d")
+        return False, "\n".join(out)
 
 
-def check_redis():
+def check_redis() -> Tuple[bool, str]:
     """Check Redis connection."""
-    print("\n=== Checking Redis ===")
+    out = []
+    out.append("\n=== Checking Redis ===")
     
     try:
         import redis
-        from dotenv import load_dotenv
-        
-        load_dotenv()
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         
-        # Parse Redis URL
-        client = redis.from_url(redis_url)
+        redis_url = _get_env("REDIS_URL") or "redis://localhost:6379/0"
         
-        # Test connection
-        response = client.ping()
-        if response:
-            print("✓ Redis connection successful")
-        else:
-            print("✗ Redis ping failed")
-            return False
-        
-        # Test set/get
-        test_key = "ai_agent_setup_test"
-        client.set(test_key, "test_value", ex=10)
-        value = client.get(test_key)
-        
-        if value == b"test_value":
-            print("✓ Redis set/get working correctly")
-            client.delete(test_key)
-        else:
-            print("✗ Redis set/get test failed")
-            return False
-        
-        # Get Redis info
-        info = client.info()
-        print(f"✓ Redis version: {info.get('redis_version', 'unknown')}")
-        print(f"✓ Redis memory: {info.get('used_memory_human', 'unknown')}")
+        pool = redis.ConnectionPool.from_url(redis_url, max_connections=4)
+        try:
+            client = redis.Redis(connection_pool=pool)
+            
+            # Send ping, set/get/delete and info as one pipeline: one round trip
+            test_key = "ai_agent_setup_test"
+            pipe = client.pipeline(transaction=False)
+            pipe.ping().set(test_key, "test_value", ex=10).get(test_key).delete(test_key).info()
+            ping_ok, _, value, _, info = pipe.execute()
+            
+            if ping_ok:
+                out.append("✓ Redis connection successful")
+            else:
+                out.append("✗ Redis ping failed")
+                return False, "\n".join(out)
+            
+            if value == b"test_value":
+                out.append("✓ Redis set/get working correctly")
+            else:
+                out.append("✗ Redis set/get test failed")
+                return False, "\n".join(out)
+            
+            out.append(f"✓ Redis version: {info.get('redis_version', 'unknown')}")
+            out.append(f"✓ Redis memory: {info.get('used_memory_human', 'unknown')}")
+        finally:
+            pool.disconnect()
         
-        client.close()
-        print("\n✅ Redis check passed")
-        return True
+        out.append("\n✅ Redis check passed")
+        return True, "\n".join(out)
         
     except ImportError as e:
-        print(f"❌ Missing Python package: {e}")
-        print("  Run: pip install -r requirements.txt")
-        return False
+        out.append(f"❌ Missing Python package: {e}")
+        out.append("  Run: pip install -r requirements.txt")
+        return False, "\n".join(out)
     except Exception as e:
-        print(f"❌ Redis connection failed: {e}")
-        print("  Make sure Redis is running: docker-compose up -d redis")
-        return False
+        out.append(f"❌ Redis connection failed: {e}")
+        out.append("  Make sure Redis is running: docker-compose up -d redis")
+        return False, "\n".join(out)
 
 
-def check_python_dependencies():
+def check_python_dependencies() -> Tuple[bool, str]:
     """Check that required Python packages are installed."""
-    print("\n=== Checking Python Dependencies ===")
+    out = []
+    out.append("\n=== Checking Python Dependencies ===")
     
     required_packages = [
         "fastapi",
@@ -225,124 +302,339 @@ def check_python_dependencies():
     missing_ai_agent = []
     
     for package in required_packages:
-        try:
-            __import__(package)
-            print(f"✓ {package}")
-        except ImportError:
-            print(f"✗ {package}")
+        if has_module(package):
+            out.append(f"✓ {package}")
+        else:
+            out.append(f"✗ {package}")
             missing_required.append(package)
     
     for package in ai_agent_packages:
-        try:
-            __import__(package)
-            print(f"✓ {package}")
-        except ImportError:
-            print(f"⚠ {package} (AI Agent dependency)")
+        if has_module(package):
+            out.append(f"✓ {package}")
+        else:
+            out.append(f"⚠ {package} (AI Agent dependency)")
             missing_ai_agent.append(package)
     
     if missing_required:
-        print(f"\n❌ Missing required packages: {', '.join(missing_required)}")
-        print("  Run: pip install -r requirements.txt")
-        return False
+        out.append(f"\n❌ Missing required packages: {', '.join(missing_required)}")
+        out.append("  Run: pip install -r requirements.txt")
+        return False, "\n".join(out)
     
     if missing_ai_agent:
-        print(f"\n⚠️  Missing AI Agent packages: {', '.join(missing_ai_agent)}")
-        print("  These will be needed for AI Agent implementation")
-        print("  Run: pip install -r requirements.txt")
+        out.append(f"\n⚠️  Missing AI Agent packages: {', '.join(missing_ai_agent)}")
+        out.append("  These will be needed for AI Agent implementation")
+        out.append("  Run: pip install -r requirements.txt")
     
-    print("\n✅ Python dependencies check passed")
-    return True
+    out.append("\n✅ Python dependencies check passed")
+    return True, "\n".join(out)
+
 
+def _compose_project_name() -> str:
+    """
+    Name of this repository's Compose project.
 
-def check_docker_services():
+    Compose uses COMPOSE_PROJECT_NAME when set, otherwise the name of the
+    directory holding the compose file, lowercased with characters other
+    than letters, digits, '-' and '_' removed.
+    """
+    name = _get_env("COMPOSE_PROJECT_NAME") or COMPOSE_FILE.resolve().parent.name
+    return re.sub(r"[^a-z0-9_-]", "", name.lower()).lstrip("_-")
+
+
+def _list_running_services() -> List[str]:
+    """
+    List the running services of this repository's Docker Compose project.
+
+    Uses the Docker SDK when it is installed, talking to the daemon socket
+    directly and keeping containers labelled with this project. Otherwise
+    makes a single `docker compose ps --format json` call and keeps the
+    services whose State is running. Raises CalledProcessError if the
+    compose command fails, e.g. when the Compose plugin is not installed.
+    """
+    try:
+        import docker
+    except ImportError:
+        docker = None
+    
+    if docker is not None:
+        client = docker.from_env()
+        try:
+            containers = client.containers.list(filters={
+                "status": "running",
+                "label": f"com.docker.compose.project={_compose_project_name()}",
+            })
+            return sorted({
+                container.labels["com.docker.compose.service"]
+                for container in containers
+                if "com.docker.compose.service" in container.labels
+            })
+        finally:
+            client.close()
+    
+    import subprocess
+    import orjson
+    
+    result = subprocess.run(
+        ["docker", "compose", "ps", "--format", "json"],
+        capture_output=True,
+        text=True,
+        cwd=COMPOSE_FILE.parent
+    )
+    result.check_returncode()
+    
+    output = result.stdout.strip()
+    if not output:
+        return []
+    # Older Compose releases print a JSON array, newer ones one object per line
+    if output.startswith("["):
+        entries = orjson.loads(output)
+    else:
+        entries = [orjson.loads(line) for line in output.splitlines() if line]
+    # Keyed by service so scaled services with several containers appear once
+    running = {
+        entry["Service"]: entry
+        for entry in entries
+        if entry.get("State") == "running"
+    }
+    return list(running)
+
+
+def _in_container() -> bool:
+    """Check whether this script is itself running in Docker or Kubernetes."""
+    return os.path.exists("/.dockerenv") or bool(_get_env("KUBERNETES_SERVICE_HOST"))
+
+
+def check_docker_services() -> Tuple[bool, str]:
     """Check if Docker services are running."""
-    print("\n=== Checking Docker Services ===")
+    out = []
+    out.append("\n=== Checking Docker Services ===")
+    
+    # Compose services are not visible from inside a container, so listing
+    # them would only fail
+    if _in_container():
+        out.append("⚠ Running inside a container - skipping Docker services check")
+        return True, "\n".join(out)
+    
+    import subprocess
     
     try:
-        import subprocess
-        
-        # Check if docker-compose is available
-        result = subprocess.run(
-            ["docker-compose", "--version"],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            print("❌ docker-compose not found")
-            print("  Install Docker Compose: https://docs.docker.com/compose/install/")
-            return False
+        running_services = _list_running_services()
         
-        print(f"✓ docker-compose: {result.stdout.strip()}")
+        if "postgres" in running_services:
+            out.append("✓ PostgreSQL container running")
+        else:
+            out.append("⚠ PostgreSQL container not running")
+            out.append("  Start with: docker-compose up -d postgres")
         
-        # Check running containers
-        result = subprocess.run(
-            ["docker-compose", "ps", "--services", "--filter", "status=running"],
-            capture_output=True,
-            text=True,
-            cwd=Path(__file__).parent.parent
-        )
+        if "redis" in running_services:
+            out.append("✓ Redis container running")
+        else:
+            out.append("⚠ Redis container not running")
+            out.append("  Start with: docker-compose up -d redis")
         
-        if result.returncode == 0:
-            running_services = result.stdout.strip().split("\n")
-            running_services = [s for s in running_services if s]
-            
-            if "postgres" in running_services:
-                print("✓ PostgreSQL container running")
-            else:
-                print("⚠ PostgreSQL container not running")
-                print("  Start with: docker-compose up -d postgres")
-            
-            if "redis" in running_services:
-                print("✓ Redis container running")
-            else:
-                print("⚠ Redis container not running")
-                print("  Start with: docker-compose up -d redis")
-            
-            if running_services:
-                print(f"\n✓ Running services: {', '.join(running_services)}")
-            else:
-                print("\n⚠ No services running")
-                print("  Start services with: docker-compose up -d")
+        if running_services:
+            out.append(f"\n✓ Running services: {', '.join(running_services)}")
+        else:
+            out.append("\n⚠ No services running")
+            out.append("  Start services with: docker-compose up -d")
         
-        print("\n✅ Docker services check passed")
-        return True
+        out.append("\n✅ Docker services check passed")
+        return True, "\n".join(out)
         
+    except subprocess.CalledProcessError as e:
+        out.append("❌ docker compose ps failed")
+        if e.stderr:
+            out.append(f"  {e.stderr.strip()}")
+        out.append("  Install Docker Compose: https://docs.docker.com/compose/install/")
+        return False, "\n".join(out)
     except FileNotFoundError:
-        print("❌ docker-compose command not found")
-        print("  Install Docker Compose: https://docs.docker.com/compose/install/")
-        return False
+        out.append("❌ docker command not found")
+        out.append("  Install Docker Compose: https://docs.docker.com/compose/install/")
+        return False, "\n".join(out)
     except Exception as e:
-        print(f"⚠ Could not check Docker services: {e}")
-        return True  # Don't fail if we can't check Docker
+        out.append(f"⚠ Could not check Docker services: {e}")
+        return True, "\n".join(out)  # Don't fail if we can't check Docker
+
+
+# Checks by --only/--skip key, in the order they are reported. Each check
+# imports its own dependencies, so unselected checks cost nothing.
+CHECKS = {
+    "env": ("Environment Variables", check_environment_variables),
+    "docker": ("Docker Services", check_docker_services),
+    "deps": ("Python Dependencies", check_python_dependencies),
+    "postgres": ("PostgreSQL", check_postgresql),
+    "redis": ("Redis", check_redis),
+}
+
+
+def _config_hash(name: str) -> str:
+    """
+    Hash the configuration a cacheable check depends on.
+
+    Both checks depend on this script, which holds the lists they verify.
+    The environment check also depends on the values of the variables it
+    reads, including those from .env. The dependency check depends on the
+    environment (sys.prefix), requirements.txt and the modification times
+    of the sys.path directories, which change whenever pip installs or
+    removes a package there, so no distribution metadata is read.
+    """
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    if name == "Environment Variables":
+        for var in REQUIRED_ENV_VARS + OPTIONAL_ENV_VARS:
+            digest.update(f"{var}={_get_env(var) or ''}\0".encode())
+    else:
+        digest.update(f"{sys.prefix}\0".encode())
+        if REQUIREMENTS_FILE.exists():
+            digest.update(REQUIREMENTS_FILE.read_bytes())
+        for entry in sys.path:
+            try:
+                mtime = os.stat(entry or ".").st_mtime_ns
+            except OSError:
+                continue
+            digest.update(f"{entry}={mtime}\0".encode())
+    return digest.hexdigest()
+
+
+def _load_cache() -> dict:
+    """Load cached check results, ignoring a missing or corrupt cache file."""
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict) -> None:
+    """Persist cached check results; failures to write are not fatal."""
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(cache))
+    except OSError:
+        pass
+
+
+def _is_cached(entry: Optional[dict], config_hash: Optional[str]) -> bool:
+    """Check whether a cache entry is a recent pass for the same configuration."""
+    return bool(
+        entry
+        and entry.get("hash") == config_hash
+        and entry.get("passed")
+        and time.time() - entry.get("ts", 0) < CACHE_TTL_SECONDS
+    )
 
 
 def main():
     """Run all verification checks."""
-    print("=" * 60)
-    print("AI Agent System - Setup Verification")
-    print("=" * 60)
-    
-    # Load environment variables
-    from dotenv import load_dotenv
-    load_dotenv()
+    parser = argparse.ArgumentParser(description="Verify AI Agent System setup")
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=list(CHECKS),
+        help="Run only this check (repeatable)"
+    )
+    parser.add_argument(
+        "--skip",
+        action="append",
+        choices=list(CHECKS),
+        default=[],
+        help="Skip this check (repeatable)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every check, ignoring results cached from previous runs"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON instead of the formatted report"
+    )
+    args = parser.parse_args()
     
-    checks = [
-        ("Environment Variables", check_environment_variables),
-        ("Docker Services", check_docker_services),
-        ("Python Dependencies", check_python_dependencies),
-        ("PostgreSQL", check_postgresql),
-        ("Redis", check_redis),
+    selected = [
+        key for key in CHECKS
+        if (not args.only or key in args.only) and key not in args.skip
     ]
+    checks = [CHECKS[key] for key in selected]
+    if not checks:
+        parser.error("no checks selected")
+    
+    if not args.json:
+        print("=" * 60)
+        print("AI Agent System - Setup Verification")
+        print("=" * 60)
+    
+    config_hashes = {}
+    for name, _ in checks:
+        if name in CACHEABLE_CHECKS:
+            try:
+                config_hashes[name] = _config_hash(name)
+            except ImportError:
+                # python-dotenv is missing; the check itself reports it
+                config_hashes[name] = None
+    cache = {} if args.force else _load_cache()
     
     results = {}
+    details = {}
     
-    for name, check_func in checks:
+    # The checks are independent, so run them concurrently; each returns its
+    # output as one string, printed in the original order
+    def run_check(name, check_func):
         try:
-            results[name] = check_func()
+            return check_func()
         except Exception as e:
-            print(f"\n❌ {name} check failed with error: {e}")
-            results[name] = False
+            return False, f"\n❌ {name} check failed with error: {e}"
+    
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [
+            (
+                name,
+                None
+                if name in CACHEABLE_CHECKS
+                and _is_cached(cache.get(name), config_hashes[name])
+                else executor.submit(run_check, name, check_func),
+            )
+            for name, check_func in checks
+        ]
+        for name, future in futures:
+            if future is None:
+                results[name] = True
+                details[name] = (
+                    f"\n=== Checking {name} ===\n"
+                    "✓ Passed on a previous run with unchanged configuration "
+                    "(use --force to re-run)"
+                )
+            else:
+                results[name], details[name] = future.result()
+                if name in CACHEABLE_CHECKS:
+                    if results[name]:
+                        cache[name] = {
+                            "hash": config_hashes[name],
+                            "passed": True,
+                            "ts": time.time(),
+                        }
+                    else:
+                        cache.pop(name, None)
+            
+            if not args.json:
+                sys.stdout.write(details[name] + "\n")
+    
+    _save_cache(cache)
+    
+    all_passed = all(results.values())
+    
+    if args.json:
+        json.dump(
+            {
+                "checks": {
+                    name: {"passed": passed, "detail": details[name].strip()}
+                    for name, passed in results.items()
+                }
+            },
+            sys.stdout,
+            ensure_ascii=False,
+        )
+        sys.stdout.write("\n")
+        return 0 if all_passed else 1
     
     # Summary
     print("\n" + "=" * 60)
@@ -353,8 +645,6 @@ def main():
         status = "✅ PASSED" if passed else "❌ FAILED"
         print(f"{name}: {status}")
     
-    all_passed = all(results.values())
-    
     if all_passed:
         print("\n🎉 All checks passed! Your environment is ready.")
         print("\nNext steps:")
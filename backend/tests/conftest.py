@@ -10,14 +10,22 @@ import os
 import sys
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool
 
 # Add the app directory to the Python path
 # This allows tests to import from the app module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Session factory shared by every test; db_session binds each session to its
+# own connection. join_transaction_mode turns commit()/rollback() inside a
+# test into SAVEPOINT operations.
+_SessionFactory = sessionmaker(
+    autoflush=False,
+    join_transaction_mode="create_savepoint",
+)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
@@ -43,49 +51,147 @@ def setup_test_environment():
         os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 
 
-@pytest.fixture(scope="function")
-def db_session():
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
     """
-    Create a fresh database session for each test.
+    Drop the bcrypt work factor to its minimum for the test session.
 
-    This fixture provides an isolated database session for each test function.
-    It uses an in-memory SQLite database for fast execution and ensures
-    complete isolation between tests by creating and dropping tables for
-    each test.
+    hash_password reads settings.bcrypt_rounds on every call, so patching
+    the setting is enough. The algorithm and salting are unchanged; only the
+    key-stretching cost goes from 2**12 to 2**4 iterations, which otherwise
+    dominates the runtime of every test that registers or logs in a user.
+    """
+    from app.core.config import settings
 
-    Benefits:
-    - Fast execution (in-memory database)
-    - Complete isolation (fresh database per test)
-    - No cleanup required (database destroyed after test)
-    - No test pollution (each test starts with clean state)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "bcrypt_rounds", 4)
+        yield
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """
+    Create the test database engine and schema once per test session.
+
+    Uses a named shared-cache in-memory SQLite database, one per
+    pytest-xdist worker, so the engine can use a normal connection pool and
+    workers never share state. Tables are created a single time; per-test
+    isolation comes from the transaction rollback in db_session instead of
+    dropping and recreating the schema for every test.
 
     Yields:
-        Session: SQLAlchemy database session for the test
+        Engine: SQLAlchemy engine bound to the in-memory database
     """
     from app.core.database import Base
 
     # Import models to ensure they're registered with Base.metadata
     from app.models.user import PasswordResetToken, User  # noqa: F401
 
-    # Create an in-memory SQLite database
-    # StaticPool ensures the same connection is reused (required for :memory:)
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///file:test_{worker}?mode=memory&cache=shared&uri=true",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+        poolclass=QueuePool,
     )
 
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, connection_record):
+        # pysqlite's own transaction handling breaks SAVEPOINT, so disable
+        # it and let SQLAlchemy emit BEGIN itself
+        dbapi_connection.isolation_level = None
+
+        # The database is throwaway, so skip journaling and fsync work
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    # A shared in-memory database is dropped when its last connection
+    # closes, so hold one open for the whole session
+    keepalive = engine.connect()
+
     # Create all tables defined in the Base metadata
     Base.metadata.create_all(bind=engine)
 
-    # Create a session factory and instantiate a session
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = TestingSessionLocal()
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        keepalive.close()
+        engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(db_engine):
+    """
+    Create an isolated database session for each test.
+
+    The session is bound to a connection inside an outer transaction that
+    is rolled back after the test. Commits made by the code under test only
+    release a SAVEPOINT, so nothing persists between tests.
+
+    Benefits:
+    - Fast execution (schema created once, in-memory database)
+    - Complete isolation (every test's writes are rolled back)
+    - No cleanup required (rollback discards all changes)
+    - No test pollution (each test starts with clean state)
+
+    Yields:
+        Session: SQLAlchemy database session for the test
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+
+    session = _SessionFactory(bind=connection)
 
     try:
         # Yield the session to the test
         yield session
     finally:
-        # Cleanup: close the session and drop all tables
+        # Cleanup: close the session and discard everything the test wrote
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def seeded_credentials(fast_password_hashing):
+    """
+    Credentials and password hash for a pre-registered test user.
+
+    The bcrypt hash is computed once per session, so tests that only need
+    some existing user do not pay for hashing a password each time.
+
+    Returns:
+        tuple: (email, password, password_hash)
+    """
+    from app.core.security import hash_password
+
+    email = "seeded@example.com"
+    password = "SecurePass123"
+    return email, password, hash_password(password)
+
+
+@pytest.fixture(scope="function")
+def seeded_user(db_session, seeded_credentials):
+    """
+    Insert the seeded test user into this test's database session.
+
+    The row is added with the precomputed hash and flushed to assign its id;
+    the db_session rollback removes it after the test.
+
+    Returns:
+        User: The inserted user
+    """
+    from app.models.user import User
+
+    email, _, password_hash = seeded_credentials
+    user = User(email=email, password_hash=password_hash, is_active=True)
+    db_session.add(user)
+    db_session.flush()
+    return user
@@ -0,0 +1,74 @@
+"""
+Pytest fixtures shared by the service tests.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.gemini_client import GeminiClient
+
+
+class _StubResponse(SimpleNamespace):
+    """
+    Attribute bag usable as ``async with session.post(...) as response``.
+
+    The context manager methods live on the class because ``async with``
+    looks them up on the type, not the instance.
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+@pytest.fixture(scope="session")
+def gemini_client():
+    """
+    Provide one GeminiClient for the whole test session.
+
+    The client only holds its API key and base URL, so tests can share a
+    single instance instead of constructing their own.
+    """
+    return GeminiClient(api_key="test-key")
+
+
+@pytest.fixture(scope="session")
+def _mock_session_template():
+    """Build the aiohttp session mock once per session, without a spec."""
+    session = AsyncMock()
+    session.post = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=None)
+    return session
+
+
+@pytest.fixture
+def respond(monkeypatch, _mock_session_template):
+    """
+    Make aiohttp.ClientSession() yield the shared session mock.
+
+    Returns respond(status, payload), which points the session's post() at a
+    stub response whose json() and text() both return payload, and returns
+    the session so tests can inspect the request. The client only reads
+    status, awaits json()/text() and enters the response as an async context
+    manager, so a plain _StubResponse stands in for an AsyncMock. monkeypatch
+    restores the real class at teardown.
+    """
+    session = _mock_session_template
+    session.reset_mock(return_value=False, side_effect=True)
+    monkeypatch.setattr("aiohttp.ClientSession", lambda *args, **kwargs: session)
+
+    def respond(status, payload=None):
+        async def _payload():
+            return payload
+
+        session.post.return_value = _StubResponse(
+            status=status, json=_payload, text=_payload
+        )
+        return session
+
+    return respond
@@ -5,12 +5,17 @@ Tests the /api/v1/agent/query endpoint with various scenarios including
 cache hits, cache misses, error handling, and response validation.
 """
 
+import json
 import os
-import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
-from fastapi.testclient import TestClient
 
-# Disable OpenTelemetry during tests to avoid span export errors
+import httpx
+import pytest
+import pytest_asyncio
+
+# Disable OpenTelemetry during tests to avoid span export errors; with it
+# disabled, app.core.telemetry never imports the OpenTelemetry SDK.
 os.environ["OTEL_ENABLED"] = "false"
 
 from app.main import app
@@ -22,86 +27,157 @@ from app.schemas.agent import (
 )
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+# Request bodies shared by the tests below, encoded once and sent as raw
+# content so repeated posts do not re-serialize the same dict.
+_BODY_CREATE_NESTJS_CONTROLLER = {"prompt": "Create a NestJS controller"}
+_BODY_CREATE_CONTROLLER = {"prompt": "Create a controller"}
+_BODY_WITH_CONTEXT = {
+    "prompt": "Create a controller",
+    "context": {"framework": "NestJS"},
+}
+_BODY_WITH_MAX_ITERATIONS = {"prompt": "Create a controller", "max_iterations": 5}
+
+_JSON_HEADERS = {"content-type": "application/json"}
+_PAYLOAD_CREATE_NESTJS_CONTROLLER = json.dumps(_BODY_CREATE_NESTJS_CONTROLLER).encode()
+_PAYLOAD_CREATE_CONTROLLER = json.dumps(_BODY_CREATE_CONTROLLER).encode()
+_PAYLOAD_WITH_CONTEXT = json.dumps(_BODY_WITH_CONTEXT).encode()
+_PAYLOAD_WITH_MAX_ITERATIONS = json.dumps(_BODY_WITH_MAX_ITERATIONS).encode()
+# One character over the 10000-character prompt limit.
+_PAYLOAD_PROMPT_TOO_LONG = json.dumps({"prompt": "a" * 10001}).encode()
+
+_EMBEDDING = [0.1] * 1536
+
+# Workflow result returned by the mocked agent_workflow.execute. Tests only
+# read it, so one validated instance is shared; variants use model_copy().
+_STOCK_RESPONSE = AgentResponse(
+    result="Generated code",
+    metadata=ResponseMetadata(
+        trace_id="test-trace-id",
+        cache_hit=False,
+        processing_time_ms=1000.0,
+        tokens_used=500,
+        agents_invoked=["supervisor", "code_gen"],
+        workflow_iterations=1
+    )
+)
+
+
+# Every test here shares the module-scoped client below, so they all run on
+# the module's event loop.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client():
+    """
+    Create one async HTTP client for the FastAPI app, shared by every test here.
 
+    Requests go straight to the ASGI app through httpx's ASGITransport on
+    the test's event loop, without TestClient's worker-thread bridge. The
+    client holds no per-test state; the endpoint's dependencies are patched
+    by the function-scoped mock fixtures below. Lifespan events are not run.
+    """
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as async_client:
+        yield async_client
 
-@pytest.fixture
+
+# The three dependency mocks below patch the endpoint module once for the
+# whole file; _reset_endpoint_mocks restores their defaults before each test.
+@pytest.fixture(scope="module")
 def mock_semantic_cache():
     """Mock semantic cache for testing."""
     with patch("app.api.v1.endpoints.agent.semantic_cache") as mock_cache:
         mock_cache.redis_client = MagicMock()
         mock_cache.pg_pool = MagicMock()
+        mock_cache.get_with_embedding = AsyncMock()
+        mock_cache.set = AsyncMock()
         yield mock_cache
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_embedding_service():
     """Mock embedding service for testing."""
     with patch("app.api.v1.endpoints.agent.embedding_service") as mock_service:
-        mock_service.embed_text = AsyncMock(return_value=[0.1] * 1536)
+        mock_service.embed_text = AsyncMock()
         yield mock_service
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_agent_workflow():
     """Mock agent workflow for testing."""
     with patch("app.api.v1.endpoints.agent.agent_workflow") as mock_workflow:
+        mock_workflow.execute = AsyncMock()
         yield mock_workflow
 
 
-def test_agent_query_endpoint_exists(client):
+@pytest.fixture(autouse=True)
+def _reset_endpoint_mocks(mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
+    """
+    Clear call records and restore the default mock behaviour before each test.
+
+    Defaults: a cache miss with successful writes, a fixed embedding, and a
+    workflow that returns the stock response. Tests adjust return_value or
+    side_effect on the prebuilt AsyncMocks rather than replacing them.
+    """
+    for mock in (mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
+        mock.reset_mock(return_value=True, side_effect=True)
+    mock_semantic_cache.get_with_embedding.return_value = None
+    mock_semantic_cache.set.return_value = True
+    mock_embedding_service.embed_text.return_value = _EMBEDDING
+    mock_agent_workflow.execute.return_value = _STOCK_RESPONSE
+
+
+async def test_agent_query_endpoint_exists(client):
     """Test that the agent query endpoint exists and accepts POST requests."""
     # Send a request without proper payload to check endpoint exists
-    response = client.post("/api/v1/agent/query", json={})
+    response = await client.post("/api/v1/agent/query", json={})
     
     # Should return 422 (validation error) not 404 (not found)
     assert response.status_code in [422, 400], "Endpoint should exist and validate input"
 
 
-def test_agent_query_validation_error(client):
+async def test_agent_query_validation_error(client):
     """Test that invalid requests return 400/422 with validation errors."""
     # Empty prompt should fail validation
-    response = client.post("/api/v1/agent/query", json={"prompt": ""})
+    response = await client.post("/api/v1/agent/query", json={"prompt": ""})
     
     assert response.status_code in [422, 400]
     assert "detail" in response.json()
 
 
-def test_agent_query_prompt_too_long(client):
+async def test_agent_query_prompt_too_long(client):
     """Test that prompts exceeding max length are rejected."""
-    # Create a prompt longer than 10000 characters
-    long_prompt = "a" * 10001
-    
-    response = client.post("/api/v1/agent/query", json={"prompt": long_prompt})
+    response = await client.post(
+        "/api/v1/agent/query",
+        content=_PAYLOAD_PROMPT_TOO_LONG,
+        headers=_JSON_HEADERS,
+    )
     
     assert response.status_code in [422, 400]
     assert "detail" in response.json()
 
 
-@pytest.mark.asyncio
 async def test_agent_query_cache_hit(
     client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow
 ):
     """Test that cache hits return cached responses without invoking workflow."""
-    from datetime import datetime
-    
     # Mock cache hit
     cached_response = CachedResponse(
         response="Cached code result",
-        embedding=[0.1] * 1536,
+        embedding=_EMBEDDING,
         similarity_score=0.97,
         cached_at=datetime.utcnow(),
         ttl=3600
     )
-    mock_semantic_cache.get_with_embedding = AsyncMock(return_value=cached_response)
+    mock_semantic_cache.get_with_embedding.return_value = cached_response
     
     # Make request
-    response = client.post(
+    response = await client.post(
         "/api/v1/agent/query",
-        json={"prompt": "Create a NestJS controller"}
+        content=_PAYLOAD_CREATE_NESTJS_CONTROLLER,
+        headers=_JSON_HEADERS,
     )
     
     # Verify response
@@ -122,33 +198,17 @@ async def test_agent_query_cache_hit(
     mock_agent_workflow.execute.assert_not_called()
 
 
-@pytest.mark.asyncio
 async def test_agent_query_cache_miss(
     client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow
 ):
     """Test that cache misses execute the workflow and cache the result."""
-    # Mock cache miss
-    mock_semantic_cache.get_with_embedding = AsyncMock(return_value=None)
-    mock_semantic_cache.set = AsyncMock(return_value=True)
-    
-    # Mock workflow execution
-    mock_response = AgentResponse(
-        result="Generated code",
-        metadata=ResponseMetadata(
-            trace_id="test-trace-id",
-            cache_hit=False,
-            processing_time_ms=1000.0,
-            tokens_used=500,
-            agents_invoked=["supervisor", "code_gen"],
-            workflow_iterations=1
-        )
-    )
-    mock_agent_workflow.execute = AsyncMock(return_value=mock_response)
+    # Cache miss and the stock workflow response are the fixture defaults
     
     # Make request
-    response = client.post(
+    response = await client.post(
         "/api/v1/agent/query",
-        json={"prompt": "Create a NestJS controller"}
+        content=_PAYLOAD_CREATE_NESTJS_CONTROLLER,
+        headers=_JSON_HEADERS,
     )
     
     # Verify response
@@ -172,33 +232,15 @@ async def test_agent_query_cache_miss(
     mock_semantic_cache.set.assert_called_once()
 
 
-def test_agent_query_with_context(client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
+async def test_agent_query_with_context(client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
     """Test that requests with context are processed correctly."""
-    # Mock cache miss
-    mock_semantic_cache.get_with_embedding = AsyncMock(return_value=None)
-    mock_semantic_cache.set = AsyncMock(return_value=True)
-    
-    # Mock workflow execution
-    mock_response = AgentResponse(
-        result="Generated NestJS code",
-        metadata=ResponseMetadata(
-            trace_id="test-trace-id",
-            cache_hit=False,
-            processing_time_ms=1000.0,
-            tokens_used=500,
-            agents_invoked=["supervisor", "documentation_search", "code_gen"],
-            workflow_iterations=1
-        )
-    )
-    mock_agent_workflow.execute = AsyncMock(return_value=mock_response)
+    # Cache miss and the stock workflow response are the fixture defaults
     
     # Make request with context
-    response = client.post(
+    response = await client.post(
         "/api/v1/agent/query",
-        json={
-            "prompt": "Create a controller",
-            "context": {"framework": "NestJS"}
-        }
+        content=_PAYLOAD_WITH_CONTEXT,
+        headers=_JSON_HEADERS,
     )
     
     # Verify response
@@ -212,33 +254,25 @@ def test_agent_query_with_context(client, mock_semantic_cache, mock_embedding_se
     assert call_args.kwargs.get("context") == {"framework": "NestJS"}
 
 
-def test_agent_query_with_max_iterations(client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
+async def test_agent_query_with_max_iterations(client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
     """Test that max_iterations parameter is passed to workflow."""
-    # Mock cache miss
-    mock_semantic_cache.get_with_embedding = AsyncMock(return_value=None)
-    mock_semantic_cache.set = AsyncMock(return_value=True)
+    # Cache miss and the stock workflow response are the fixture defaults
     
     # Mock workflow execution
-    mock_response = AgentResponse(
-        result="Generated code",
-        metadata=ResponseMetadata(
-            trace_id="test-trace-id",
-            cache_hit=False,
-            processing_time_ms=1000.0,
-            tokens_used=500,
-            agents_invoked=["supervisor", "code_gen"],
-            workflow_iterations=2
-        )
+    mock_response = _STOCK_RESPONSE.model_copy(
+        update={
+            "metadata": _STOCK_RESPONSE.metadata.model_copy(
+                update={"workflow_iterations": 2}
+            )
+        }
     )
-    mock_agent_workflow.execute = AsyncMock(return_value=mock_response)
+    mock_agent_workflow.execute.return_value = mock_response
     
     # Make request with max_iterations
-    response = client.post(
+    response = await client.post(
         "/api/v1/agent/query",
-        json={
-            "prompt": "Create a controller",
-            "max_iterations": 5
-        }
+        content=_PAYLOAD_WITH_MAX_ITERATIONS,
+        headers=_JSON_HEADERS,
     )
     
     # Verify response
@@ -250,9 +284,9 @@ def test_agent_query_with_max_iterations(client, mock_semantic_cache, mock_embed
     assert call_args.kwargs.get("max_iterations") == 5
 
 
-def test_agent_health_check(client):
+async def test_agent_health_check(client):
     """Test the agent health check endpoint."""
-    response = client.get("/api/v1/agent/health")
+    response = await client.get("/api/v1/agent/health")
     
     # Should return 200 or 503 depending on service state
     assert response.status_code in [200, 503]
@@ -262,35 +296,19 @@ def test_agent_health_check(client):
     assert data["status"] in ["healthy", "unhealthy"]
 
 
-@pytest.mark.asyncio
 async def test_agent_query_graceful_cache_degradation(
     client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow
 ):
     """Test that cache failures don't break the request."""
     # Mock cache failure
-    mock_semantic_cache.get_with_embedding = AsyncMock(
-        side_effect=Exception("Cache unavailable")
-    )
-    mock_semantic_cache.set = AsyncMock(return_value=False)
-    
-    # Mock workflow execution
-    mock_response = AgentResponse(
-        result="Generated code",
-        metadata=ResponseMetadata(
-            trace_id="test-trace-id",
-            cache_hit=False,
-            processing_time_ms=1000.0,
-            tokens_used=500,
-            agents_invoked=["supervisor", "code_gen"],
-            workflow_iterations=1
-        )
-    )
-    mock_agent_workflow.execute = AsyncMock(return_value=mock_response)
+    mock_semantic_cache.get_with_embedding.side_effect = Exception("Cache unavailable")
+    mock_semantic_cache.set.return_value = False
     
     # Make request
-    response = client.post(
+    response = await client.post(
         "/api/v1/agent/query",
-        json={"prompt": "Create a NestJS controller"}
+        content=_PAYLOAD_CREATE_NESTJS_CONTROLLER,
+        headers=_JSON_HEADERS,
     )
     
     # Should still succeed despite cache failure
@@ -303,30 +321,15 @@ async def test_agent_query_graceful_cache_degradation(
     mock_agent_workflow.execute.assert_called_once()
 
 
-def test_agent_query_response_metadata_completeness(client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
+async def test_agent_query_response_metadata_completeness(client, mock_semantic_cache, mock_embedding_service, mock_agent_workflow):
     """Test that response metadata includes all required fields."""
-    # Mock cache miss
-    mock_semantic_cache.get_with_embedding = AsyncMock(return_value=None)
-    mock_semantic_cache.set = AsyncMock(return_value=True)
-    
-    # Mock workflow execution
-    mock_response = AgentResponse(
-        result="Generated code",
-        metadata=ResponseMetadata(
-            trace_id="test-trace-id",
-            cache_hit=False,
-            processing_time_ms=1000.0,
-            tokens_used=500,
-            agents_invoked=["supervisor", "code_gen"],
-            workflow_iterations=1
-        )
-    )
-    mock_agent_workflow.execute = AsyncMock(return_value=mock_response)
+    # Cache miss and the stock workflow response are the fixture defaults
     
     # Make request
-    response = client.post(
+    response = await client.post(
         "/api/v1/agent/query",
-        json={"prompt": "Create a controller"}
+        content=_PAYLOAD_CREATE_CONTROLLER,
+        headers=_JSON_HEADERS,
     )
     
     # Verify response
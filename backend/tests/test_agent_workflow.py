@@ -5,8 +5,10 @@ Tests workflow state management, node execution, conditional routing,
 and cycle support.
 """
 
+import asyncio
+from typing import Optional
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.schemas.agent import (
     CodeGenerationResult,
@@ -17,148 +19,167 @@ from app.schemas.agent import (
 from app.workflows.agent_workflow import AgentWorkflow
 
 
-@pytest.fixture
-def mock_supervisor():
-    """Mock supervisor agent."""
-    supervisor = MagicMock()
-    supervisor.determine_routing_strategy = AsyncMock(
-        return_value=RoutingStrategy.SEARCH_THEN_CODE
-    )
-    return supervisor
-
-
-@pytest.fixture
-def mock_search_agent():
-    """Mock documentation search agent."""
-    search_agent = MagicMock()
-    search_agent.search_docs = AsyncMock(
-        return_value=[
-            DocumentationResult(
-                content="Test documentation content",
-                score=0.92,
-                metadata={"section": "Controllers"},
-                source="https://docs.test.com",
-                framework="NestJS"
-            )
-        ]
-    )
-    return search_agent
+# Initial state for a fresh workflow run; tests override the one or two
+# fields they exercise through make_state.
+_DEFAULT_STATE: WorkflowState = {
+    "prompt": "test",
+    "routing_strategy": None,
+    "documentation_results": None,
+    "generated_code": None,
+    "framework": None,
+    "iteration_count": 0,
+    "max_iterations": 3,
+    "trace_id": "test-trace-id",
+    "errors": [],
+}
 
 
-@pytest.fixture
-def mock_code_gen_agent():
-    """Mock code generation agent."""
-    code_gen_agent = MagicMock()
-    code_gen_agent.generate_code = AsyncMock(
-        return_value=CodeGenerationResult(
-            code="@Controller('test')\nexport class TestController {}",
-            language="TypeScript",
-            framework="NestJS",
-            syntax_valid=True,
-            validation_errors=[],
-            tokens_used=100,
-            documentation_sources=["https://docs.test.com"]
-        )
+# Agent results returned by the stub agents. Nodes and tests only read
+# them, so one validated instance of each is shared by every test.
+_DEFAULT_DOC_RESULTS = [
+    DocumentationResult(
+        content="Test documentation content",
+        score=0.92,
+        metadata={"section": "Controllers"},
+        source="https://docs.test.com",
+        framework="NestJS"
     )
-    return code_gen_agent
+]
+_DEFAULT_CODEGEN_RESULT = CodeGenerationResult(
+    code="@Controller('test')\nexport class TestController {}",
+    language="TypeScript",
+    framework="NestJS",
+    syntax_valid=True,
+    validation_errors=[],
+    tokens_used=100,
+    documentation_sources=["https://docs.test.com"]
+)
+
+
+def make_state(**overrides) -> WorkflowState:
+    """Return a copy of the default workflow state with overrides applied."""
+    # Nodes append to errors in place, so each state gets its own list
+    return _DEFAULT_STATE | {"errors": []} | overrides
+
+
+class _StubSupervisor:
+    """Supervisor stand-in that routes every prompt to SEARCH_THEN_CODE."""
+    
+    def __init__(self, error: Optional[Exception] = None):
+        # Raised from determine_routing_strategy when set
+        self.error = error
+    
+    async def determine_routing_strategy(self, prompt, trace_id=None):
+        if self.error is not None:
+            raise self.error
+        return RoutingStrategy.SEARCH_THEN_CODE
+
+
+class _StubSearchAgent:
+    """Documentation search stand-in that returns one NestJS result."""
+    
+    async def search_docs(self, query, frameworks=None, top_k=10, min_score=0.7):
+        return _DEFAULT_DOC_RESULTS
+
+
+class _StubCodeGenAgent:
+    """Code generation stand-in that returns syntactically valid code."""
+    
+    async def generate_code(
+        self, prompt, documentation_context=None, framework=None, trace_id=None
+    ):
+        return _DEFAULT_CODEGEN_RESULT
 
 
-@pytest.fixture
-def workflow(mock_supervisor, mock_search_agent, mock_code_gen_agent):
-    """Create workflow with mocked agents."""
+# The stub agents and the workflow are built once per session;
+# _reset_agent_stubs restores the defaults before each test.
+@pytest.fixture(scope="session")
+def stub_supervisor():
+    """Stub supervisor agent."""
+    return _StubSupervisor()
+
+
+@pytest.fixture(scope="session")
+def stub_search_agent():
+    """Stub documentation search agent."""
+    return _StubSearchAgent()
+
+
+@pytest.fixture(scope="session")
+def stub_code_gen_agent():
+    """Stub code generation agent."""
+    return _StubCodeGenAgent()
+
+
+@pytest.fixture(scope="session")
+def workflow(stub_supervisor, stub_search_agent, stub_code_gen_agent):
+    """Create workflow with stub agents."""
     return AgentWorkflow(
-        supervisor=mock_supervisor,
-        search_agent=mock_search_agent,
-        code_gen_agent=mock_code_gen_agent
+        supervisor_instance=stub_supervisor,
+        search_agent_instance=stub_search_agent,
+        code_gen_agent_instance=stub_code_gen_agent
     )
 
 
+@pytest.fixture(autouse=True)
+def _reset_agent_stubs(workflow, stub_supervisor, stub_search_agent, stub_code_gen_agent):
+    """Re-attach the shared stub agents and clear any injected supervisor error."""
+    workflow.supervisor = stub_supervisor
+    workflow.search_agent = stub_search_agent
+    workflow.code_gen_agent = stub_code_gen_agent
+    stub_supervisor.error = None
+
+
 class TestWorkflowNodes:
     """Test individual workflow nodes."""
     
-    def test_supervisor_node_success(self, workflow):
+    async def test_supervisor_node_success(self, workflow):
         """Test supervisor node successfully determines routing strategy."""
-        state: WorkflowState = {
-            "prompt": "Create a NestJS controller",
-            "routing_strategy": None,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(prompt="Create a NestJS controller")
         
-        result_state = workflow.supervisor_node(state)
+        result_state = await workflow.supervisor_node(state)
         
         assert result_state["routing_strategy"] == RoutingStrategy.SEARCH_THEN_CODE
         assert len(result_state["errors"]) == 0
     
-    def test_supervisor_node_missing_prompt(self, workflow):
+    async def test_supervisor_node_missing_prompt(self, workflow):
         """Test supervisor node handles missing prompt."""
-        state: WorkflowState = {
-            "prompt": "",
-            "routing_strategy": None,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(prompt="")
         
-        result_state = workflow.supervisor_node(state)
+        result_state = await workflow.supervisor_node(state)
         
         assert len(result_state["errors"]) > 0
         assert "Missing required field: prompt" in result_state["errors"][0]
     
-    def test_search_node_success(self, workflow):
+    async def test_search_node_success(self, workflow):
         """Test search node successfully retrieves documentation."""
-        state: WorkflowState = {
-            "prompt": "NestJS controller",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": "NestJS",
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(
+            prompt="NestJS controller",
+            routing_strategy=RoutingStrategy.SEARCH_THEN_CODE,
+            framework="NestJS",
+        )
         
-        result_state = workflow.search_node(state)
+        result_state = await workflow.search_node(state)
         
         assert result_state["documentation_results"] is not None
         assert len(result_state["documentation_results"]) > 0
         assert result_state["documentation_results"][0].framework == "NestJS"
     
-    def test_search_node_missing_prompt(self, workflow):
+    async def test_search_node_missing_prompt(self, workflow):
         """Test search node handles missing prompt."""
-        state: WorkflowState = {
-            "prompt": "",
-            "routing_strategy": RoutingStrategy.SEARCH_ONLY,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(prompt="", routing_strategy=RoutingStrategy.SEARCH_ONLY)
         
-        result_state = workflow.search_node(state)
+        result_state = await workflow.search_node(state)
         
         assert result_state["documentation_results"] == []
         assert len(result_state["errors"]) > 0
     
-    def test_code_gen_node_success(self, workflow):
+    async def test_code_gen_node_success(self, workflow):
         """Test code generation node successfully generates code."""
-        state: WorkflowState = {
-            "prompt": "Create a NestJS controller",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": [
+        state = make_state(
+            prompt="Create a NestJS controller",
+            routing_strategy=RoutingStrategy.SEARCH_THEN_CODE,
+            documentation_results=[
                 DocumentationResult(
                     content="Test doc",
                     score=0.9,
@@ -167,52 +188,30 @@ class TestWorkflowNodes:
                     framework="NestJS"
                 )
             ],
-            "generated_code": None,
-            "framework": "NestJS",
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+            framework="NestJS",
+        )
         
-        result_state = workflow.code_gen_node(state)
+        result_state = await workflow.code_gen_node(state)
         
         assert result_state["generated_code"] is not None
         assert "@Controller" in result_state["generated_code"]
         assert result_state["code_generation_result"].syntax_valid is True
     
-    def test_code_gen_node_missing_prompt(self, workflow):
+    async def test_code_gen_node_missing_prompt(self, workflow):
         """Test code generation node handles missing prompt."""
-        state: WorkflowState = {
-            "prompt": "",
-            "routing_strategy": RoutingStrategy.CODE_ONLY,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(prompt="", routing_strategy=RoutingStrategy.CODE_ONLY)
         
-        result_state = workflow.code_gen_node(state)
+        result_state = await workflow.code_gen_node(state)
         
         assert result_state["generated_code"] is None
         assert len(result_state["errors"]) > 0
     
     def test_validate_node_increments_iteration(self, workflow):
         """Test validation node increments iteration count."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": None,
-            "generated_code": "test code",
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(
+            routing_strategy=RoutingStrategy.SEARCH_THEN_CODE,
+            generated_code="test code",
+        )
         
         result_state = workflow.validate_node(state)
         
@@ -220,19 +219,11 @@ class TestWorkflowNodes:
     
     def test_validate_node_sets_default_max_iterations(self, workflow):
         """Test validation node sets default max_iterations if missing."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.CODE_ONLY,
-            "documentation_results": None,
-            "generated_code": "test code",
-            "framework": None,
-            "iteration_count": 0,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
-        # Remove max_iterations
-        if "max_iterations" in state:
-            del state["max_iterations"]
+        state = make_state(
+            routing_strategy=RoutingStrategy.CODE_ONLY,
+            generated_code="test code",
+        )
+        del state["max_iterations"]
         
         result_state = workflow.validate_node(state)
         
@@ -242,160 +233,63 @@ class TestWorkflowNodes:
 class TestConditionalRouting:
     """Test conditional routing logic."""
     
-    def test_route_after_supervisor_search_only(self, workflow):
-        """Test routing to search for SEARCH_ONLY strategy."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_ONLY,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
-        
-        next_node = workflow.route_after_supervisor(state)
-        
-        assert next_node == "search"
-    
-    def test_route_after_supervisor_code_only(self, workflow):
-        """Test routing to code for CODE_ONLY strategy."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.CODE_ONLY,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
-        
-        next_node = workflow.route_after_supervisor(state)
-        
-        assert next_node == "code"
-    
-    def test_route_after_supervisor_search_then_code(self, workflow):
-        """Test routing to search for SEARCH_THEN_CODE strategy."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
-        
-        next_node = workflow.route_after_supervisor(state)
-        
-        assert next_node == "search"
-    
-    def test_route_after_supervisor_no_strategy(self, workflow):
-        """Test routing ends when no strategy is set."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": None,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+    @pytest.mark.parametrize(
+        "strategy,expected_node",
+        [
+            (RoutingStrategy.SEARCH_ONLY, "search"),
+            (RoutingStrategy.CODE_ONLY, "code"),
+            (RoutingStrategy.SEARCH_THEN_CODE, "search"),
+            (None, "end"),
+        ],
+        ids=["search_only", "code_only", "search_then_code", "no_strategy"],
+    )
+    def test_route_after_supervisor(self, workflow, strategy, expected_node):
+        """Test the node chosen after the supervisor for each routing strategy."""
+        state = make_state(routing_strategy=strategy)
         
         next_node = workflow.route_after_supervisor(state)
         
-        assert next_node == "end"
+        assert next_node == expected_node
 
 
 class TestCycleSupport:
     """Test workflow cycle support."""
     
-    def test_should_retry_max_iterations_reached(self, workflow):
-        """Test workflow ends when max iterations reached."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": None,
-            "generated_code": "test code",
-            "framework": None,
-            "iteration_count": 3,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
-        
-        decision = workflow.should_retry(state)
-        
-        assert decision == "done"
-    
-    def test_should_retry_syntax_errors_under_max(self, workflow):
-        """Test workflow retries when syntax errors and under max iterations."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": None,
-            "generated_code": "test code",
-            "code_generation_result": CodeGenerationResult(
-                code="invalid code",
-                language="Python",
-                framework=None,
-                syntax_valid=False,
-                validation_errors=["Syntax error on line 1"],
-                tokens_used=50,
-                documentation_sources=[]
-            ),
-            "framework": None,
-            "iteration_count": 1,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
-        
-        decision = workflow.should_retry(state)
-        
-        assert decision == "retry"
-    
-    def test_should_retry_syntax_valid(self, workflow):
-        """Test workflow ends when code is syntactically valid."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_THEN_CODE,
-            "documentation_results": None,
-            "generated_code": "test code",
-            "code_generation_result": CodeGenerationResult(
-                code="valid code",
+    @pytest.mark.parametrize(
+        "iteration_count,syntax_valid,expected_decision",
+        [
+            (3, False, "done"),
+            (1, False, "retry"),
+            (1, True, "done"),
+        ],
+        ids=["max_iterations_reached", "syntax_errors_under_max", "syntax_valid"],
+    )
+    def test_should_retry(self, workflow, iteration_count, syntax_valid, expected_decision):
+        """Test retry decision from iteration count and generated code validity."""
+        state = make_state(
+            routing_strategy=RoutingStrategy.SEARCH_THEN_CODE,
+            generated_code="test code",
+            code_generation_result=CodeGenerationResult(
+                code="test code",
                 language="Python",
                 framework=None,
-                syntax_valid=True,
-                validation_errors=[],
+                syntax_valid=syntax_valid,
+                validation_errors=[] if syntax_valid else ["Syntax error on line 1"],
                 tokens_used=50,
                 documentation_sources=[]
             ),
-            "framework": None,
-            "iteration_count": 1,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+            iteration_count=iteration_count,
+        )
         
         decision = workflow.should_retry(state)
         
-        assert decision == "done"
+        assert decision == expected_decision
     
     def test_should_retry_search_only(self, workflow):
         """Test workflow ends for SEARCH_ONLY strategy."""
-        state: WorkflowState = {
-            "prompt": "test",
-            "routing_strategy": RoutingStrategy.SEARCH_ONLY,
-            "documentation_results": [
+        state = make_state(
+            routing_strategy=RoutingStrategy.SEARCH_ONLY,
+            documentation_results=[
                 DocumentationResult(
                     content="test",
                     score=0.9,
@@ -404,13 +298,8 @@ class TestCycleSupport:
                     framework="NestJS"
                 )
             ],
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 1,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+            iteration_count=1,
+        )
         
         decision = workflow.should_retry(state)
         
@@ -420,91 +309,86 @@ class TestCycleSupport:
 class TestStateManagement:
     """Test state persistence and validation."""
     
-    def test_state_persists_across_nodes(self, workflow):
+    async def test_state_persists_across_nodes(self, workflow):
         """Test state data persists across node transitions."""
-        initial_state: WorkflowState = {
-            "prompt": "Create a NestJS controller",
-            "routing_strategy": None,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": "NestJS",
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        initial_state = make_state(
+            prompt="Create a NestJS controller", framework="NestJS"
+        )
+        # Nodes update the state in place, so compare against a snapshot
+        expected = dict(initial_state)
         
         # Execute supervisor node
-        state_after_supervisor = workflow.supervisor_node(initial_state)
+        state_after_supervisor = await workflow.supervisor_node(initial_state)
         
         # Verify state persisted
-        assert state_after_supervisor["prompt"] == initial_state["prompt"]
-        assert state_after_supervisor["framework"] == initial_state["framework"]
-        assert state_after_supervisor["trace_id"] == initial_state["trace_id"]
+        assert state_after_supervisor["prompt"] == expected["prompt"]
+        assert state_after_supervisor["framework"] == expected["framework"]
+        assert state_after_supervisor["trace_id"] == expected["trace_id"]
         assert state_after_supervisor["routing_strategy"] is not None
+        routing_strategy = state_after_supervisor["routing_strategy"]
         
         # Execute search node
-        state_after_search = workflow.search_node(state_after_supervisor)
+        state_after_search = await workflow.search_node(state_after_supervisor)
         
         # Verify state persisted
-        assert state_after_search["prompt"] == initial_state["prompt"]
-        assert state_after_search["framework"] == initial_state["framework"]
-        assert state_after_search["routing_strategy"] == state_after_supervisor["routing_strategy"]
+        assert state_after_search["prompt"] == expected["prompt"]
+        assert state_after_search["framework"] == expected["framework"]
+        assert state_after_search["routing_strategy"] == routing_strategy
         assert state_after_search["documentation_results"] is not None
     
-    def test_errors_accumulate_in_state(self, workflow):
+    async def test_errors_accumulate_in_state(self, workflow):
         """Test errors accumulate in state across nodes."""
-        state: WorkflowState = {
-            "prompt": "",  # Invalid prompt
-            "routing_strategy": None,
-            "documentation_results": None,
-            "generated_code": None,
-            "framework": None,
-            "iteration_count": 0,
-            "max_iterations": 3,
-            "trace_id": "test-trace-id",
-            "errors": []
-        }
+        state = make_state(prompt="")  # Invalid prompt
         
         # Execute nodes with invalid state
-        state = workflow.supervisor_node(state)
+        state = await workflow.supervisor_node(state)
         assert len(state["errors"]) > 0
         
         error_count = len(state["errors"])
-        state = workflow.search_node(state)
+        state = await workflow.search_node(state)
         assert len(state["errors"]) > error_count  # More errors accumulated
 
 
-@pytest.mark.asyncio
-async def test_workflow_execute_end_to_end(workflow):
-    """Test complete workflow execution."""
-    response = await workflow.execute(
-        prompt="Create a NestJS controller for user authentication",
-        trace_id="test-trace-id",
-        context={"framework": "NestJS"},
-        max_iterations=3
+async def test_workflow_execute_scenarios(
+    workflow, stub_search_agent, stub_code_gen_agent
+):
+    """Test a complete workflow run and an erroring run concurrently."""
+    # The error scenario gets its own workflow with a failing supervisor so
+    # the concurrent runs share no agent state; the compiled graph is shared
+    failing_workflow = AgentWorkflow(
+        supervisor_instance=_StubSupervisor(error=Exception("Test error")),
+        search_agent_instance=stub_search_agent,
+        code_gen_agent_instance=stub_code_gen_agent
+    )
+    
+    response, error_response = await asyncio.gather(
+        workflow.execute(
+            prompt="Create a NestJS controller for user authentication",
+            trace_id="test-trace-id",
+            context={"framework": "NestJS"},
+            max_iterations=3
+        ),
+        failing_workflow.execute(
+            prompt="Test prompt",
+            trace_id="test-error-trace-id",
+            max_iterations=3
+        ),
     )
     
-    assert response.result is not None
+    # Search, code generation and one validation pass; the code is valid, so
+    # the workflow does not retry
+    assert response.result.startswith(_DEFAULT_CODEGEN_RESULT.code)
     assert response.metadata.trace_id == "test-trace-id"
     assert response.metadata.cache_hit is False
-    assert "supervisor" in response.metadata.agents_invoked
-    assert response.metadata.workflow_iterations >= 0
-
-
-@pytest.mark.asyncio
-async def test_workflow_execute_with_error(workflow):
-    """Test workflow execution handles errors gracefully."""
-    # Make supervisor raise an error
-    workflow.supervisor.determine_routing_strategy = AsyncMock(
-        side_effect=Exception("Test error")
-    )
+    assert response.metadata.agents_invoked == [
+        "supervisor", "documentation_search", "code_gen"
+    ]
+    assert response.metadata.tokens_used == _DEFAULT_CODEGEN_RESULT.tokens_used
+    assert response.metadata.workflow_iterations == 1
     
-    response = await workflow.execute(
-        prompt="Test prompt",
-        trace_id="test-trace-id",
-        max_iterations=3
+    # The supervisor error is recorded in the state and the run ends there
+    assert error_response.result == (
+        "Workflow completed with errors:\nSupervisor error: Test error"
     )
-    
-    assert "Error" in response.result or "error" in response.result.lower()
-    assert response.metadata.trace_id == "test-trace-id"
+    assert error_response.metadata.trace_id == "test-error-trace-id"
+    assert error_response.metadata.workflow_iterations == 0
@@ -5,32 +5,127 @@ Tests the authentication API endpoints to ensure they work correctly
 with proper request/response handling and status codes.
 """
 
+import json
+from contextvars import ContextVar
+
+import httpx
 import pytest
-from app.core.dependencies import get_db
+import pytest_asyncio
+from app.core.dependencies import get_db, get_token_sink
 from app.main import app
-from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+TEST_EMAIL = "test@example.com"
+TEST_PASSWORD = "TestPass123"
+
+# Request bodies shared by the tests below, encoded once and sent as raw
+# content so repeated posts do not re-serialize the same dict.
+_JSON_HEADERS = {"content-type": "application/json"}
+_CREDENTIALS = {"email": TEST_EMAIL, "password": TEST_PASSWORD}
+_PAYLOAD_CREDENTIALS = json.dumps(_CREDENTIALS).encode()
+_PAYLOAD_DUPLICATE_EMAIL = json.dumps(
+    {"email": TEST_EMAIL, "password": "DifferentPass456"}
+).encode()
+_PAYLOAD_WEAK_PASSWORD = json.dumps({"email": TEST_EMAIL, "password": "short"}).encode()
+_PAYLOAD_UNKNOWN_USER = json.dumps(
+    {"email": "nonexistent@example.com", "password": "WrongPass123"}
+).encode()
+_PAYLOAD_CHANGE_PASSWORD = json.dumps(
+    {"current_password": TEST_PASSWORD, "new_password": "NewPass456"}
+).encode()
+_PAYLOAD_CHANGE_PASSWORD_WRONG_CURRENT = json.dumps(
+    {"current_password": "WrongPass999", "new_password": "NewPass456"}
+).encode()
+_PAYLOAD_RESET_REQUEST = json.dumps({"email": TEST_EMAIL}).encode()
+_PAYLOAD_INVALID_REFRESH = json.dumps({"refresh_token": "invalid.token.here"}).encode()
+
+
+# Every test here shares the module-scoped client below, so they all run on
+# the module's event loop.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client():
+    """
+    Create one async HTTP client for the FastAPI app, shared by every test here.
+
+    Requests go straight to the ASGI app through httpx's ASGITransport
+    instead of TestClient's worker-thread bridge. The database dependency is
+    overridden by _override_db and resolves to each test's own session.
+    """
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as async_client:
+        yield async_client
+
+
+# Database session for the running test. get_db is overridden once for the
+# module and reads the session from here; _use_db_session sets it per test.
+_current_db: ContextVar[Session] = ContextVar("_current_db")
+
+
+def _override_get_db():
+    yield _current_db.get()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _override_db():
+    """Route the get_db dependency to the current test's database session."""
+    app.dependency_overrides[get_db] = _override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(autouse=True)
+def _use_db_session(db_session):
+    """Make this test's database session the one get_db hands out."""
+    token = _current_db.set(db_session)
+    yield
+    _current_db.reset(token)
+
+
+# Function-scoped like db_session: every test's writes are rolled back, so a
+# user registered in one test does not exist in the next.
+@pytest_asyncio.fixture(loop_scope="module")
+async def registered_user(client):
+    """Register the default test user and return its credentials."""
+    response = await client.post(
+        "/api/auth/register", content=_PAYLOAD_CREDENTIALS, headers=_JSON_HEADERS
+    )
+    assert response.status_code == 201
+    return _CREDENTIALS
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def auth_tokens(client, registered_user):
+    """Log the default test user in and return the token response body."""
+    response = await client.post(
+        "/api/auth/login", content=_PAYLOAD_CREDENTIALS, headers=_JSON_HEADERS
+    )
+    assert response.status_code == 200
+    return response.json()
 
 
 @pytest.fixture
-def client(db_session):
-    """Create test client with database session override."""
+def access_token(auth_tokens):
+    """Bearer access token for the default test user."""
+    return auth_tokens["access_token"]
 
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
 
-    app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
-    app.dependency_overrides.clear()
+@pytest.fixture
+def reset_tokens():
+    """Collect the password reset tokens issued during the test."""
+    tokens = []
+    app.dependency_overrides[get_token_sink] = lambda: tokens
+    yield tokens
+    app.dependency_overrides.pop(get_token_sink, None)
 
 
-def test_register_endpoint(client):
+async def test_register_endpoint(client):
     """Test POST /api/auth/register endpoint."""
-    response = client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "TestPass123"},
+    response = await client.post(
+        "/api/auth/register", content=_PAYLOAD_CREDENTIALS, headers=_JSON_HEADERS
     )
 
     assert response.status_code == 201
@@ -41,44 +136,30 @@ def test_register_endpoint(client):
     assert data["is_active"] is True
 
 
-def test_register_duplicate_email(client):
+async def test_register_duplicate_email(client, registered_user):
     """Test registration with duplicate email returns 409."""
-    # Register first user
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "TestPass123"},
-    )
-
     # Try to register with same email
-    response = client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "DifferentPass456"},
+    response = await client.post(
+        "/api/auth/register", content=_PAYLOAD_DUPLICATE_EMAIL, headers=_JSON_HEADERS
     )
 
     assert response.status_code == 409
     assert "already registered" in response.json()["detail"].lower()
 
 
-def test_register_weak_password(client):
+async def test_register_weak_password(client):
     """Test registration with weak password returns 422."""
-    response = client.post(
-        "/api/auth/register", json={"email": "test@example.com", "password": "short"}
+    response = await client.post(
+        "/api/auth/register", content=_PAYLOAD_WEAK_PASSWORD, headers=_JSON_HEADERS
     )
 
     assert response.status_code == 422
 
 
-def test_login_endpoint(client):
+async def test_login_endpoint(client, registered_user):
     """Test POST /api/auth/login endpoint."""
-    # Register user first
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "TestPass123"},
-    )
-
-    # Login
-    response = client.post(
-        "/api/auth/login", json={"email": "test@example.com", "password": "TestPass123"}
+    response = await client.post(
+        "/api/auth/login", content=_PAYLOAD_CREDENTIALS, headers=_JSON_HEADERS
     )
 
     assert response.status_code == 200
@@ -88,111 +169,76 @@ def test_login_endpoint(client):
     assert data["token_type"] == "bearer"
 
 
-def test_login_invalid_credentials(client):
+async def test_login_invalid_credentials(client):
     """Test login with invalid credentials returns 401."""
-    response = client.post(
-        "/api/auth/login",
-        json={"email": "nonexistent@example.com", "password": "WrongPass123"},
+    response = await client.post(
+        "/api/auth/login", content=_PAYLOAD_UNKNOWN_USER, headers=_JSON_HEADERS
     )
 
     assert response.status_code == 401
     assert "invalid" in response.json()["detail"].lower()
 
 
-def test_change_password_endpoint(client):
+async def test_change_password_endpoint(client, access_token):
     """Test POST /api/auth/change-password endpoint."""
-    # Register and login
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "OldPass123"},
-    )
-
-    login_response = client.post(
-        "/api/auth/login", json={"email": "test@example.com", "password": "OldPass123"}
-    )
-    access_token = login_response.json()["access_token"]
-
-    # Change password
-    response = client.post(
+    response = await client.post(
         "/api/auth/change-password",
-        json={"current_password": "OldPass123", "new_password": "NewPass456"},
-        headers={"Authorization": f"Bearer {access_token}"},
+        content=_PAYLOAD_CHANGE_PASSWORD,
+        headers={**_JSON_HEADERS, "Authorization": f"Bearer {access_token}"},
     )
 
     assert response.status_code == 200
     assert "success" in response.json()["message"].lower()
 
 
-def test_change_password_without_auth(client):
+async def test_change_password_without_auth(client):
     """Test change password without authentication returns 401."""
-    response = client.post(
+    response = await client.post(
         "/api/auth/change-password",
-        json={"current_password": "OldPass123", "new_password": "NewPass456"},
+        content=_PAYLOAD_CHANGE_PASSWORD,
+        headers=_JSON_HEADERS,
     )
 
     assert response.status_code == 401  # No credentials provided
 
 
-def test_change_password_wrong_current(client):
+async def test_change_password_wrong_current(client, access_token):
     """Test change password with wrong current password returns 400."""
-    # Register and login
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "OldPass123"},
-    )
-
-    login_response = client.post(
-        "/api/auth/login", json={"email": "test@example.com", "password": "OldPass123"}
-    )
-    access_token = login_response.json()["access_token"]
-
     # Try to change with wrong current password
-    response = client.post(
+    response = await client.post(
         "/api/auth/change-password",
-        json={"current_password": "WrongPass999", "new_password": "NewPass456"},
-        headers={"Authorization": f"Bearer {access_token}"},
+        content=_PAYLOAD_CHANGE_PASSWORD_WRONG_CURRENT,
+        headers={**_JSON_HEADERS, "Authorization": f"Bearer {access_token}"},
     )
 
     assert response.status_code == 400
     assert "incorrect" in response.json()["detail"].lower()
 
 
-def test_password_reset_request_endpoint(client):
+async def test_password_reset_request_endpoint(client, registered_user):
     """Test POST /api/auth/reset-password/request endpoint."""
-    # Register user
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "TestPass123"},
-    )
-
-    # Request password reset
-    response = client.post(
-        "/api/auth/reset-password/request", json={"email": "test@example.com"}
+    response = await client.post(
+        "/api/auth/reset-password/request",
+        content=_PAYLOAD_RESET_REQUEST,
+        headers=_JSON_HEADERS,
     )
 
     assert response.status_code == 200
     assert "token" in response.json()["message"].lower()
 
 
-def test_password_reset_confirm_endpoint(client):
+async def test_password_reset_confirm_endpoint(client, registered_user, reset_tokens):
     """Test POST /api/auth/reset-password/confirm endpoint."""
-    # Register user
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "OldPass123"},
-    )
-
     # Request reset
-    reset_response = client.post(
-        "/api/auth/reset-password/request", json={"email": "test@example.com"}
+    await client.post(
+        "/api/auth/reset-password/request",
+        content=_PAYLOAD_RESET_REQUEST,
+        headers=_JSON_HEADERS,
     )
-
-    # Extract token from message (in production, this would be sent via email)
-    message = reset_response.json()["message"]
-    token = message.split("Token: ")[1]
+    token = reset_tokens[-1]
 
     # Confirm reset
-    response = client.post(
+    response = await client.post(
         "/api/auth/reset-password/confirm",
         json={"token": token, "new_password": "NewPass456"},
     )
@@ -201,32 +247,22 @@ def test_password_reset_confirm_endpoint(client):
     assert "success" in response.json()["message"].lower()
 
 
-def test_refresh_token_endpoint(client):
+async def test_refresh_token_endpoint(client, auth_tokens):
     """Test POST /api/auth/refresh endpoint."""
-    # Register and login
-    client.post(
-        "/api/auth/register",
-        json={"email": "test@example.com", "password": "TestPass123"},
+    response = await client.post(
+        "/api/auth/refresh", json={"refresh_token": auth_tokens["refresh_token"]}
     )
 
-    login_response = client.post(
-        "/api/auth/login", json={"email": "test@example.com", "password": "TestPass123"}
-    )
-    refresh_token = login_response.json()["refresh_token"]
-
-    # Refresh access token
-    response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
-
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
 
-def test_refresh_with_invalid_token(client):
+async def test_refresh_with_invalid_token(client):
     """Test refresh with invalid token returns 401."""
-    response = client.post(
-        "/api/auth/refresh", json={"refresh_token": "invalid.token.here"}
+    response = await client.post(
+        "/api/auth/refresh", content=_PAYLOAD_INVALID_REFRESH, headers=_JSON_HEADERS
     )
 
     assert response.status_code == 401
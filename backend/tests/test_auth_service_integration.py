@@ -5,9 +5,13 @@ These tests verify that the AuthService works correctly with the
 database and all its dependencies.
 """
 
+from unittest.mock import patch
+
 import pytest
 from app.models.user import User
+from app.services import auth_service
 from app.services.auth_service import AuthService
+from jose import JWTError
 from sqlalchemy.orm import Session
 
 
@@ -70,12 +74,10 @@ def test_weak_password_rejected(db_session: Session):
         service.register_user(email, "12345678")
 
 
-def test_create_and_verify_tokens(db_session: Session):
+def test_create_and_verify_tokens(db_session: Session, seeded_user: User):
     """Test token creation and verification."""
     service = AuthService(db_session)
-
-    # Register a user
-    user = service.register_user("token@example.com", "SecurePass123")
+    user = seeded_user
 
     # Create access token
     access_token = service.create_access_token(user.id)
@@ -100,6 +102,29 @@ def test_create_and_verify_tokens(db_session: Session):
     assert refresh_payload["type"] == "refresh"
 
 
+def test_verify_token_caches_valid_payloads(db_session: Session, seeded_user: User):
+    """Test that repeated verification of a valid token skips decoding."""
+    service = AuthService(db_session)
+    access_token = service.create_access_token(seeded_user.id)
+    AuthService._token_cache.clear()
+
+    with patch.object(
+        auth_service, "decode_jwt_token", wraps=auth_service.decode_jwt_token
+    ) as decode:
+        first = service.verify_token(access_token)
+        # A fresh service instance shares the cache, as per-request services do
+        second = AuthService(db_session).verify_token(access_token)
+
+    assert second == first
+    assert decode.call_count == 1
+
+    # Invalid tokens are rejected every time and never cached
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            service.verify_token("invalid.token.here")
+    assert "invalid.token.here" not in AuthService._token_cache
+
+
 def test_change_password(db_session: Session):
     """Test password change functionality."""
     service = AuthService(db_session)
@@ -179,12 +204,10 @@ def test_password_reset_invalid_token(db_session: Session):
         service.confirm_password_reset("invalid_token_123", "NewPass456")
 
 
-def test_refresh_access_token(db_session: Session):
+def test_refresh_access_token(db_session: Session, seeded_user: User):
     """Test refreshing access token with refresh token."""
     service = AuthService(db_session)
-
-    # Register a user
-    user = service.register_user("refresh@example.com", "SecurePass123")
+    user = seeded_user
 
     # Create refresh token
     refresh_token = service.create_refresh_token(user.id)
@@ -200,12 +223,10 @@ def test_refresh_access_token(db_session: Session):
     assert payload["type"] == "access"
 
 
-def test_refresh_with_access_token_fails(db_session: Session):
+def test_refresh_with_access_token_fails(db_session: Session, seeded_user: User):
     """Test that using access token for refresh fails."""
     service = AuthService(db_session)
-
-    # Register a user
-    user = service.register_user("wrongtype@example.com", "SecurePass123")
+    user = seeded_user
 
     # Create access token (not refresh token)
     access_token = service.create_access_token(user.id)